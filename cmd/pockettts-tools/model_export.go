@@ -17,6 +17,12 @@ func newModelExportCmd() *cobra.Command {
 	var configPath string
 	var pythonBin string
 	var maxSeq int
+	var textBuckets []int
+	var flowLMBuckets []int
+	var bosMask bool
+	var staticStep bool
+	var kvLayout string
+	var stackKV bool
 
 	cmd := &cobra.Command{
 		Use:   "export",
@@ -33,8 +39,16 @@ func newModelExportCmd() *cobra.Command {
 				Config:    configPath,
 				PythonBin: pythonBin,
 				MaxSeq:    maxSeq,
-				Stdout:    os.Stdout,
-				Stderr:    os.Stderr,
+
+				TextBuckets:   textBuckets,
+				FlowLMBuckets: flowLMBuckets,
+				BOSMask:       bosMask,
+				StaticStep:    staticStep,
+				KVLayout:      kvLayout,
+				StackKV:       stackKV,
+
+				Stdout: os.Stdout,
+				Stderr: os.Stderr,
 			})
 			if err != nil {
 				return fmt.Errorf(
@@ -55,6 +69,12 @@ func newModelExportCmd() *cobra.Command {
 	cmd.Flags().StringVar(&configPath, "tts-config-path", "", "Path to an upstream PocketTTS config .yaml")
 	cmd.Flags().StringVar(&pythonBin, "python-bin", "", "Python interpreter for export helper (auto-detected from pocket-tts by default)")
 	cmd.Flags().IntVar(&maxSeq, "max-seq", 0, "KV-cache max sequence length (0 = script default 256; use 512+ for voice conditioning)")
+	cmd.Flags().IntSliceVar(&textBuckets, "text-buckets", nil, "Also export fixed-length text_conditioner graphs for these token counts, e.g. 32,64,128")
+	cmd.Flags().IntSliceVar(&flowLMBuckets, "flow-lm-buckets", nil, "Also export flow_lm_main_l<N> graphs with an N-step KV state, e.g. 128,512")
+	cmd.Flags().BoolVar(&bosMask, "bos-mask", false, "Give flow_lm_main/step an explicit bos_mask input instead of NaN BOS sentinels")
+	cmd.Flags().BoolVar(&staticStep, "static-step", false, "Also export flow_lm_main_bos for the first AR call (static KV layout only)")
+	cmd.Flags().StringVar(&kvLayout, "kv-layout", "", "flow_lm_prefill/step KV layout: static or trimmed (default: script default, static)")
+	cmd.Flags().BoolVar(&stackKV, "stack-kv", false, "Exchange the flow_lm_prefill/step KV cache as one stacked tensor")
 
 	return cmd
 }
@@ -125,6 +125,12 @@ func TestModelExportCmd_Flags(t *testing.T) {
 		{"language", ""},
 		{"tts-config-path", ""},
 		{"python-bin", ""},
+		{"text-buckets", "[]"},
+		{"flow-lm-buckets", "[]"},
+		{"bos-mask", "false"},
+		{"static-step", "false"},
+		{"kv-layout", ""},
+		{"stack-kv", "false"},
 	}
 
 	for _, f := range flags {
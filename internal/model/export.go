@@ -8,6 +8,7 @@ import (
 	"os/exec"
 	"path/filepath"
 	"strconv"
+	"strings"
 )
 
 type ExportOptions struct {
@@ -19,8 +20,17 @@ type ExportOptions struct {
 	Config    string
 	PythonBin string
 	MaxSeq    int // KV-cache max sequence length (0 = script default 256; use 512+ for voice conditioning)
-	Stdout    io.Writer
-	Stderr    io.Writer
+
+	// Graph-shape options the Go runtime detects from the manifest/graph I/O.
+	TextBuckets   []int  // Extra fixed-length text_conditioner_s<N> graphs.
+	FlowLMBuckets []int  // Extra flow_lm_main_l<N> graphs with an N-step KV state.
+	BOSMask       bool   // Explicit bos_mask input instead of NaN BOS sentinels.
+	StaticStep    bool   // Also export flow_lm_main_bos (requires the static KV layout).
+	KVLayout      string // flow_lm_prefill/step KV layout: "static" (script default) or "trimmed".
+	StackKV       bool   // Exchange the KV cache as one stacked kv/kv_out tensor.
+
+	Stdout io.Writer
+	Stderr io.Writer
 }
 
 func ExportONNX(opts ExportOptions) error {
@@ -63,6 +73,21 @@ func ExportONNX(opts ExportOptions) error {
 		return fmt.Errorf("resolve export helper: %w", err)
 	}
 
+	cmd := exec.Command(pythonBin, exportArgs(scriptPath, opts)...)
+	cmd.Stdout = opts.Stdout
+
+	cmd.Stderr = opts.Stderr
+
+	err = cmd.Run()
+	if err != nil {
+		return fmt.Errorf("run ONNX export helper: %w", err)
+	}
+
+	return nil
+}
+
+// exportArgs builds the export_onnx.py command line for opts.
+func exportArgs(scriptPath string, opts ExportOptions) []string {
 	args := []string{scriptPath, "--models-dir", opts.ModelsDir, "--out-dir", opts.OutDir, "--variant", opts.Variant}
 	if opts.Language != "" {
 		args = append(args, "--language", opts.Language)
@@ -80,17 +105,40 @@ func ExportONNX(opts ExportOptions) error {
 		args = append(args, "--max-seq", strconv.Itoa(opts.MaxSeq))
 	}
 
-	cmd := exec.Command(pythonBin, args...)
-	cmd.Stdout = opts.Stdout
+	if len(opts.TextBuckets) > 0 {
+		args = append(args, "--text-buckets", joinInts(opts.TextBuckets))
+	}
 
-	cmd.Stderr = opts.Stderr
+	if len(opts.FlowLMBuckets) > 0 {
+		args = append(args, "--flow-lm-buckets", joinInts(opts.FlowLMBuckets))
+	}
 
-	err = cmd.Run()
-	if err != nil {
-		return fmt.Errorf("run ONNX export helper: %w", err)
+	if opts.BOSMask {
+		args = append(args, "--bos-mask")
 	}
 
-	return nil
+	if opts.StaticStep {
+		args = append(args, "--static-step")
+	}
+
+	if opts.KVLayout != "" {
+		args = append(args, "--kv-layout", opts.KVLayout)
+	}
+
+	if opts.StackKV {
+		args = append(args, "--stack-kv")
+	}
+
+	return args
+}
+
+func joinInts(values []int) string {
+	parts := make([]string, len(values))
+	for i, v := range values {
+		parts[i] = strconv.Itoa(v)
+	}
+
+	return strings.Join(parts, ",")
 }
 
 func validateExportTooling(pythonBin string) error {
@@ -881,6 +881,44 @@ func TestExportONNX_LanguageAndConfigMutuallyExclusive(t *testing.T) {
 	}
 }
 
+func TestExportArgs_ForwardsGraphShapeOptions(t *testing.T) {
+	args := exportArgs("export_onnx.py", ExportOptions{
+		ModelsDir:     "models",
+		OutDir:        "out",
+		Variant:       "b6369a24",
+		MaxSeq:        512,
+		TextBuckets:   []int{32, 64},
+		FlowLMBuckets: []int{128},
+		BOSMask:       true,
+		StaticStep:    true,
+		KVLayout:      "static",
+		StackKV:       true,
+	})
+
+	want := []string{
+		"export_onnx.py", "--models-dir", "models", "--out-dir", "out", "--variant", "b6369a24",
+		"--max-seq", "512",
+		"--text-buckets", "32,64",
+		"--flow-lm-buckets", "128",
+		"--bos-mask",
+		"--static-step",
+		"--kv-layout", "static",
+		"--stack-kv",
+	}
+	if strings.Join(args, " ") != strings.Join(want, " ") {
+		t.Errorf("exportArgs = %q; want %q", args, want)
+	}
+}
+
+func TestExportArgs_OmitsUnsetOptions(t *testing.T) {
+	args := exportArgs("export_onnx.py", ExportOptions{ModelsDir: "models", OutDir: "out", Variant: "b6369a24"})
+
+	want := "export_onnx.py --models-dir models --out-dir out --variant b6369a24"
+	if got := strings.Join(args, " "); got != want {
+		t.Errorf("exportArgs = %q; want %q", got, want)
+	}
+}
+
 // ---------------------------------------------------------------------------
 // validateExportTooling
 // ---------------------------------------------------------------------------
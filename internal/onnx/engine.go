@@ -5,9 +5,24 @@ import (
 	"errors"
 	"fmt"
 	"log/slog"
+	"strconv"
+	"strings"
 	"sync"
 )
 
+// textConditionerBucketPrefix names the fixed-length text_conditioner graphs
+// produced by `export_onnx.py --text-buckets` (text_conditioner_s32, ...).
+const textConditionerBucketPrefix = "text_conditioner_s"
+
+// flowLMMainBucketPrefix names flow_lm_main copies traced with a KV state of
+// a different length, produced by `export_onnx.py --flow-lm-buckets`
+// (flow_lm_main_l128, ...).
+const flowLMMainBucketPrefix = "flow_lm_main_l"
+
+// flowLMMainBOSGraph names the flow_lm_main copy traced with a static
+// single-frame sequence, produced by `export_onnx.py --static-step`.
+const flowLMMainBOSGraph = "flow_lm_main_bos"
+
 // Engine manages ONNX graph runners loaded from a manifest.
 type Engine struct {
 	runners map[string]GraphRunner
@@ -76,13 +91,17 @@ func (e *Engine) TextConditioner(ctx context.Context, tokens []int64) (*Tensor,
 		return nil, errors.New("text_conditioner: token slice must not be empty")
 	}
 
+	T := int64(len(tokens))
+
+	if runner, size, ok := e.textConditionerBucket(T); ok {
+		return runTextConditionerBucket(ctx, runner, tokens, size)
+	}
+
 	runner, ok := e.runners["text_conditioner"]
 	if !ok {
 		return nil, errors.New("text_conditioner graph not found in manifest")
 	}
 
-	T := int64(len(tokens))
-
 	tokenTensor, err := NewTensor(tokens, []int64{1, T})
 	if err != nil {
 		return nil, fmt.Errorf("text_conditioner: build token tensor: %w", err)
@@ -100,3 +119,74 @@ func (e *Engine) TextConditioner(ctx context.Context, tokens []int64) (*Tensor,
 
 	return emb, nil
 }
+
+// textConditionerBucket returns the smallest fixed-length text_conditioner
+// graph that fits n tokens, together with its token length.
+func (e *Engine) textConditionerBucket(n int64) (GraphRunner, int64, bool) {
+	return e.smallestBucket(textConditionerBucketPrefix, n)
+}
+
+// smallestBucket returns the runner named prefix+<size> with the smallest
+// size >= n, together with that size.
+func (e *Engine) smallestBucket(prefix string, n int64) (GraphRunner, int64, bool) {
+	var (
+		best     GraphRunner
+		bestSize int64
+	)
+
+	for name, runner := range e.runners {
+		raw, ok := strings.CutPrefix(name, prefix)
+		if !ok {
+			continue
+		}
+
+		size, err := strconv.ParseInt(raw, 10, 64)
+		if err != nil || size < n {
+			continue
+		}
+
+		if best == nil || size < bestSize {
+			best, bestSize = runner, size
+		}
+	}
+
+	return best, bestSize, best != nil
+}
+
+// runTextConditionerBucket pads tokens to the bucket length, runs the
+// fixed-shape graph and trims the embeddings back to len(tokens). The
+// conditioner is a per-token embedding lookup, so padding does not affect
+// the embeddings of the real tokens.
+func runTextConditionerBucket(ctx context.Context, runner GraphRunner, tokens []int64, size int64) (*Tensor, error) {
+	padded := make([]int64, size)
+	copy(padded, tokens)
+
+	tokenTensor, err := NewTensor(padded, []int64{1, size})
+	if err != nil {
+		return nil, fmt.Errorf("text_conditioner: build token tensor: %w", err)
+	}
+
+	outputs, err := runner.Run(ctx, map[string]*Tensor{"tokens": tokenTensor})
+	if err != nil {
+		return nil, fmt.Errorf("text_conditioner: run bucket %d: %w", size, err)
+	}
+
+	emb, ok := outputs["text_embeddings"]
+	if !ok {
+		return nil, errors.New("text_conditioner: missing 'text_embeddings' in output")
+	}
+
+	shape := emb.Shape()
+	if len(shape) != 3 || shape[0] != 1 || shape[1] != size {
+		return nil, fmt.Errorf("text_conditioner: bucket %d output shape %v, want [1, %d, D]", size, shape, size)
+	}
+
+	data, err := ExtractFloat32(emb)
+	if err != nil {
+		return nil, fmt.Errorf("text_conditioner: extract embeddings: %w", err)
+	}
+
+	T := int64(len(tokens))
+
+	return NewTensor(data[:T*shape[2]], []int64{1, T, shape[2]})
+}
@@ -3,6 +3,7 @@ package onnx
 import (
 	"context"
 	"maps"
+	"slices"
 )
 
 // GraphRunner is the minimal runner contract required by Engine methods.
@@ -15,6 +16,21 @@ type GraphRunner interface {
 
 type runnerIface = GraphRunner
 
+// InputNamer is implemented by runners that know their graph's declared
+// inputs. Engine uses it to detect optional inputs such as bos_mask.
+type InputNamer interface {
+	InputNames() []string
+}
+
+// hasInput reports whether runner declares the named graph input. Runners
+// that do not implement InputNamer are treated as declaring none of the
+// optional inputs.
+func hasInput(runner GraphRunner, name string) bool {
+	namer, ok := runner.(InputNamer)
+
+	return ok && slices.Contains(namer.InputNames(), name)
+}
+
 // NewEngineWithRunners builds an Engine from externally provided graph runners.
 func NewEngineWithRunners(runners map[string]GraphRunner) *Engine {
 	internal := make(map[string]GraphRunner, len(runners))
@@ -65,16 +65,28 @@ func AppendLatentFrame(sequence, frame *Tensor) (*Tensor, error) {
 // Outputs:
 //   - lastHidden: [1, 1024] — transformer hidden state for flow decoding
 //   - eosLogits: [1, 1] — raw EOS logit (compare against threshold)
+//
+// When flow_lm_main_l<N> bucket graphs are present, the smallest one whose KV
+// state holds all text and sequence positions is used instead.
 func (e *Engine) FlowLMStep(ctx context.Context, sequence, textEmbeddings *Tensor) (lastHidden, eosLogits *Tensor, err error) {
-	runner, ok := e.runners["flow_lm_main"]
+	runner, ok := e.flowLMMainRunner(sequence, textEmbeddings)
 	if !ok {
 		return nil, nil, errors.New("flow_lm_main graph not found in manifest")
 	}
 
-	outputs, err := runner.Run(ctx, map[string]*Tensor{
+	inputs := map[string]*Tensor{
 		"sequence":        sequence,
 		"text_embeddings": textEmbeddings,
-	})
+	}
+
+	if hasInput(runner, "bos_mask") {
+		inputs["sequence"], inputs["bos_mask"], err = bosMaskInputs(sequence)
+		if err != nil {
+			return nil, nil, fmt.Errorf("flow_lm_main: %w", err)
+		}
+	}
+
+	outputs, err := runner.Run(ctx, inputs)
 	if err != nil {
 		return nil, nil, fmt.Errorf("flow_lm_main: run: %w", err)
 	}
@@ -92,6 +104,91 @@ func (e *Engine) FlowLMStep(ctx context.Context, sequence, textEmbeddings *Tenso
 	return lastHidden, eosLogits, nil
 }
 
+// flowLMMainRunner picks the flow_lm_main graph for a call with the given
+// inputs: the static BOS-only graph for the first step, else the smallest
+// fitting graph among the buckets and the default graph (whose length comes
+// from the manifest's max_seq_len), else the default graph.
+func (e *Engine) flowLMMainRunner(sequence, textEmbeddings *Tensor) (GraphRunner, bool) {
+	seqShape, textShape := sequence.Shape(), textEmbeddings.Shape()
+	if len(seqShape) >= 2 && seqShape[1] == 1 {
+		if runner, ok := e.runners[flowLMMainBOSGraph]; ok {
+			return runner, true
+		}
+	}
+
+	defaultRunner, hasDefault := e.runners["flow_lm_main"]
+
+	if len(seqShape) >= 2 && len(textShape) >= 2 {
+		need := seqShape[1] + textShape[1]
+		bucket, size, ok := e.smallestBucket(flowLMMainBucketPrefix, need)
+
+		defaultLen := e.maxSeqLen("flow_lm_main")
+		if hasDefault && defaultLen >= need && (!ok || defaultLen <= size) {
+			return defaultRunner, true
+		}
+
+		if ok {
+			return bucket, true
+		}
+	}
+
+	return defaultRunner, hasDefault
+}
+
+// maxSeqLen returns the manifest max_seq_len of the named graph, or 0 when it
+// is unknown.
+func (e *Engine) maxSeqLen(name string) int64 {
+	if e.sm == nil {
+		return 0
+	}
+
+	sess, ok := e.sm.Session(name)
+	if !ok {
+		return 0
+	}
+
+	return sess.MaxSeqLen
+}
+
+// bosMaskInputs converts a NaN-sentinel sequence [1, S, D] into the inputs of
+// graphs exported with --bos-mask: the sequence with BOS rows zeroed, and a
+// float32 [1, S] mask that is 1 at BOS rows and 0 elsewhere.
+func bosMaskInputs(sequence *Tensor) (clean, mask *Tensor, err error) {
+	data, err := ExtractFloat32(sequence)
+	if err != nil {
+		return nil, nil, fmt.Errorf("bos mask: %w", err)
+	}
+
+	shape := sequence.Shape()
+	if len(shape) != 3 || shape[2] <= 0 {
+		return nil, nil, fmt.Errorf("bos mask: sequence shape %v, want [1, S, D]", shape)
+	}
+
+	steps, dim := shape[1], int(shape[2])
+	cleanData := make([]float32, len(data))
+	maskData := make([]float32, steps)
+
+	for s := range maskData {
+		row := data[s*dim : (s+1)*dim]
+		if math.IsNaN(float64(row[0])) {
+			maskData[s] = 1
+			continue
+		}
+
+		copy(cleanData[s*dim:(s+1)*dim], row)
+	}
+
+	if clean, err = NewTensor(cleanData, shape); err != nil {
+		return nil, nil, fmt.Errorf("bos mask: %w", err)
+	}
+
+	if mask, err = NewTensor(maskData, []int64{1, steps}); err != nil {
+		return nil, nil, fmt.Errorf("bos mask: %w", err)
+	}
+
+	return clean, mask, nil
+}
+
 // FlowLMFlow runs the Euler flow integration (LSD decode) to convert
 // last_hidden [1, 1024] into a latent frame [1, 1, 32].
 //
@@ -170,11 +267,29 @@ func EOSDetected(eosLogits *Tensor, threshold float64) bool {
 }
 
 // FlowLMKVState holds the KV-cache accumulated during prefill and updated each
-// AR step. KV[i] has shape [2, 1, S, H, Dh] where dim-0 is K(0)/V(1).
+// AR step. KV[i] has shape [2, 1, S, H, Dh] where dim-0 is K(0)/V(1); S is
+// the graph's max_seq_len for the default static export layout, or the number
+// of tokens processed for the trimmed layout. Either way the tensors are passed
+// back to the step graph unchanged.
 // Offset is the current write position (equals the number of tokens processed).
+//
+// Graphs exported with --stack-kv exchange a single "kv"/"kv_out" tensor of
+// shape [L, 2, 1, S, H, Dh] instead; Stacked is then set and KV holds just
+// that tensor.
 type FlowLMKVState struct {
-	KV     []*Tensor
-	Offset int64
+	KV      []*Tensor
+	Offset  int64
+	Stacked bool
+}
+
+// kvName returns the graph I/O name of KV tensor i: prefix itself for a
+// stacked state, prefix_i otherwise.
+func (s *FlowLMKVState) kvName(prefix string, i int) string {
+	if s.Stacked {
+		return prefix
+	}
+
+	return fmt.Sprintf("%s_%d", prefix, i)
 }
 
 // FlowLMPrefill runs the flow_lm_prefill graph on text_embeddings (which may
@@ -193,10 +308,15 @@ func (e *Engine) FlowLMPrefill(ctx context.Context, textEmbeddings *Tensor) (*Fl
 		return nil, fmt.Errorf("flow_lm_prefill: run: %w", err)
 	}
 
-	// Unpack kv_0, kv_1, ... until a key is missing.
+	// Unpack the stacked kv output, or kv_0, kv_1, ... until a key is missing.
 	var kvTensors []*Tensor
 
-	for i := 0; ; i++ {
+	stacked, isStacked := outputs["kv"]
+	if isStacked {
+		kvTensors = []*Tensor{stacked}
+	}
+
+	for i := 0; !isStacked; i++ {
 		key := fmt.Sprintf("kv_%d", i)
 
 		kv, ok := outputs[key]
@@ -225,7 +345,7 @@ func (e *Engine) FlowLMPrefill(ctx context.Context, textEmbeddings *Tensor) (*Fl
 		return nil, errors.New("flow_lm_prefill: offset tensor is empty")
 	}
 
-	return &FlowLMKVState{KV: kvTensors, Offset: offsetData[0]}, nil
+	return &FlowLMKVState{KV: kvTensors, Offset: offsetData[0], Stacked: isStacked}, nil
 }
 
 // FlowLMStepStateful runs a single autoregressive step using the flow_lm_step
@@ -243,8 +363,16 @@ func (e *Engine) FlowLMStepStateful(ctx context.Context, sequenceFrame *Tensor,
 	inputs := map[string]*Tensor{
 		"sequence_frame": sequenceFrame,
 	}
+
+	if hasInput(runner, "bos_mask") {
+		inputs["sequence_frame"], inputs["bos_mask"], err = bosMaskInputs(sequenceFrame)
+		if err != nil {
+			return nil, nil, fmt.Errorf("flow_lm_step: %w", err)
+		}
+	}
+
 	for i, kv := range state.KV {
-		inputs[fmt.Sprintf("kv_%d", i)] = kv
+		inputs[state.kvName("kv", i)] = kv
 	}
 
 	offsetTensor, err := NewTensor([]int64{state.Offset}, []int64{1})
@@ -271,11 +399,11 @@ func (e *Engine) FlowLMStepStateful(ctx context.Context, sequenceFrame *Tensor,
 
 	// Update state in-place.
 	for i := range state.KV {
-		key := fmt.Sprintf("kv_out_%d", i)
+		key := state.kvName("kv_out", i)
 
 		updated, ok := outputs[key]
 		if !ok {
-			legacyKey := fmt.Sprintf("kv_%d", i)
+			legacyKey := state.kvName("kv", i)
 			updated, ok = outputs[legacyKey]
 			if !ok {
 				return nil, nil, fmt.Errorf("flow_lm_step: missing '%s' in output", key)
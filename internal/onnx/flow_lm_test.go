@@ -138,6 +138,163 @@ func TestFlowLMStep_MissingEOSLogitsOutput(t *testing.T) {
 	}
 }
 
+// newFlowLMMainFakeEngine returns an engine whose flow_lm_main* graphs are
+// fakes that record which of them ran last.
+func newFlowLMMainFakeEngine(t *testing.T, graphs ...string) (*Engine, *string) {
+	t.Helper()
+
+	hidden, _ := NewTensor(make([]float32, 1024), []int64{1, 1024})
+	eos, _ := NewTensor([]float32{0}, []int64{1, 1})
+
+	used := new(string)
+	runners := make(map[string]runnerIface, len(graphs))
+
+	for _, name := range graphs {
+		runners[name] = &fakeRunner{
+			name: name,
+			fn: func(_ context.Context, _ map[string]*Tensor) (map[string]*Tensor, error) {
+				*used = name
+				return map[string]*Tensor{"last_hidden": hidden, "eos_logits": eos}, nil
+			},
+		}
+	}
+
+	return engineWithFakeRunners(runners), used
+}
+
+func TestFlowLMStep_SelectsMainGraph(t *testing.T) {
+	type step struct {
+		steps int64
+		want  string
+	}
+
+	for _, tc := range []struct {
+		name       string
+		graphs     []string
+		defaultLen int64 // manifest max_seq_len of flow_lm_main; 0 when unknown
+		textTokens int64
+		steps      []step
+	}{
+		{
+			name:       "smallest fitting bucket",
+			graphs:     []string{"flow_lm_main", "flow_lm_main_l16", "flow_lm_main_l64", "flow_lm_main_lbad"},
+			textTokens: 10,
+			steps: []step{
+				{steps: 6, want: "flow_lm_main_l16"},
+				{steps: 7, want: "flow_lm_main_l64"},
+				{steps: 60, want: "flow_lm_main"},
+			},
+		},
+		{
+			// --max-seq 256 --flow-lm-buckets 128,512
+			name:       "default graph smaller than bucket",
+			graphs:     []string{"flow_lm_main", "flow_lm_main_l128", "flow_lm_main_l512"},
+			defaultLen: 256,
+			textTokens: 10,
+			steps: []step{
+				{steps: 100, want: "flow_lm_main_l128"},
+				{steps: 200, want: "flow_lm_main"},
+				{steps: 246, want: "flow_lm_main"},
+				{steps: 247, want: "flow_lm_main_l512"},
+			},
+		},
+		{
+			name:       "static BOS graph for first step",
+			graphs:     []string{"flow_lm_main", "flow_lm_main_bos", "flow_lm_main_l16"},
+			textTokens: 4,
+			steps: []step{
+				{steps: 1, want: "flow_lm_main_bos"},
+				{steps: 2, want: "flow_lm_main_l16"},
+			},
+		},
+	} {
+		t.Run(tc.name, func(t *testing.T) {
+			e, used := newFlowLMMainFakeEngine(t, tc.graphs...)
+			if tc.defaultLen > 0 {
+				e.sm = &SessionManager{sessions: map[string]Session{
+					"flow_lm_main": {Name: "flow_lm_main", MaxSeqLen: tc.defaultLen},
+				}}
+			}
+
+			emb, _ := NewTensor(make([]float32, tc.textTokens*1024), []int64{1, tc.textTokens, 1024})
+
+			for _, st := range tc.steps {
+				seq, _ := NewTensor(make([]float32, st.steps*32), []int64{1, st.steps, 32})
+
+				if _, _, err := e.FlowLMStep(context.Background(), seq, emb); err != nil {
+					t.Fatalf("FlowLMStep(steps=%d): %v", st.steps, err)
+				}
+
+				if *used != st.want {
+					t.Errorf("steps=%d used %s, want %s", st.steps, *used, st.want)
+				}
+			}
+		})
+	}
+}
+
+// inputNamedRunner is a fakeRunner that also declares its graph inputs.
+type inputNamedRunner struct {
+	*fakeRunner
+	inputs []string
+}
+
+func (r inputNamedRunner) InputNames() []string { return r.inputs }
+
+func TestFlowLMStep_BOSMaskReplacesNaNSentinel(t *testing.T) {
+	hidden, _ := NewTensor(make([]float32, 1024), []int64{1, 1024})
+	eos, _ := NewTensor([]float32{0}, []int64{1, 1})
+
+	var gotMask, gotSeq []float32
+
+	runner := inputNamedRunner{
+		fakeRunner: &fakeRunner{
+			name: "flow_lm_main",
+			fn: func(_ context.Context, inputs map[string]*Tensor) (map[string]*Tensor, error) {
+				gotMask, _ = ExtractFloat32(inputs["bos_mask"])
+				gotSeq, _ = ExtractFloat32(inputs["sequence"])
+
+				return map[string]*Tensor{"last_hidden": hidden, "eos_logits": eos}, nil
+			},
+		},
+		inputs: []string{"sequence", "text_embeddings", "bos_mask"},
+	}
+	e := engineWithFakeRunners(map[string]runnerIface{"flow_lm_main": runner})
+
+	frameData := make([]float32, 32)
+	for i := range frameData {
+		frameData[i] = 0.5
+	}
+
+	frame, _ := NewTensor(frameData, []int64{1, 1, 32})
+
+	seq, err := AppendLatentFrame(NewBOSSequence(), frame)
+	if err != nil {
+		t.Fatalf("AppendLatentFrame: %v", err)
+	}
+
+	emb, _ := NewTensor(make([]float32, 1024), []int64{1, 1, 1024})
+
+	if _, _, err := e.FlowLMStep(context.Background(), seq, emb); err != nil {
+		t.Fatalf("FlowLMStep: %v", err)
+	}
+
+	if !slices.Equal(gotMask, []float32{1, 0}) {
+		t.Errorf("bos_mask = %v, want [1 0]", gotMask)
+	}
+
+	for i, v := range gotSeq {
+		want := float32(0)
+		if i >= 32 {
+			want = 0.5
+		}
+
+		if v != want {
+			t.Fatalf("sequence[%d] = %v, want %v (NaN sentinel must be cleared)", i, v, want)
+		}
+	}
+}
+
 // ---------------------------------------------------------------------------
 // Unit tests for NewBOSSequence
 // ---------------------------------------------------------------------------
@@ -476,6 +633,70 @@ func TestFlowLMPrefill_UnpacksKVState(t *testing.T) {
 	}
 }
 
+// TestFlowLMPrefill_StackedKVRoundTrip verifies that a stacked "kv" prefill
+// output is passed to the step graph as "kv" and replaced by its "kv_out".
+func TestFlowLMPrefill_StackedKVRoundTrip(t *testing.T) {
+	const numLayers = 3
+	T := int64(5)
+
+	kvShape := []int64{numLayers, 2, 1, 16, 2, 4}
+	fakePrefill := &fakeRunner{
+		name: "flow_lm_prefill",
+		fn: func(_ context.Context, _ map[string]*Tensor) (map[string]*Tensor, error) {
+			kv, _ := NewTensor(make([]float32, numLayers*2*16*2*4), kvShape)
+			offset, _ := NewTensor([]int64{T}, []int64{1})
+
+			return map[string]*Tensor{"kv": kv, "offset": offset}, nil
+		},
+	}
+
+	updated, _ := NewTensor(make([]float32, numLayers*2*16*2*4), kvShape)
+	fakeStep := &fakeRunner{
+		name: "flow_lm_step",
+		fn: func(_ context.Context, inputs map[string]*Tensor) (map[string]*Tensor, error) {
+			if _, ok := inputs["kv"]; !ok {
+				t.Error("step inputs should contain the stacked 'kv' tensor")
+			}
+
+			hidden, _ := NewTensor(make([]float32, 1024), []int64{1, 1024})
+			eos, _ := NewTensor([]float32{0}, []int64{1, 1})
+			offset, _ := NewTensor([]int64{T + 1}, []int64{1})
+
+			return map[string]*Tensor{
+				"last_hidden": hidden,
+				"eos_logits":  eos,
+				"kv_out":      updated,
+				"offset_out":  offset,
+			}, nil
+		},
+	}
+
+	e := engineWithFakeRunners(map[string]runnerIface{
+		"flow_lm_prefill": fakePrefill,
+		"flow_lm_step":    fakeStep,
+	})
+
+	textEmb, _ := NewTensor(make([]float32, T*1024), []int64{1, T, 1024})
+
+	state, err := e.FlowLMPrefill(context.Background(), textEmb)
+	if err != nil {
+		t.Fatalf("FlowLMPrefill: %v", err)
+	}
+
+	if !state.Stacked || len(state.KV) != 1 {
+		t.Fatalf("state Stacked=%v len(KV)=%d; want stacked single tensor", state.Stacked, len(state.KV))
+	}
+
+	frame, _ := NewTensor(make([]float32, 32), []int64{1, 1, 32})
+	if _, _, err := e.FlowLMStepStateful(context.Background(), frame, state); err != nil {
+		t.Fatalf("FlowLMStepStateful: %v", err)
+	}
+
+	if state.KV[0] != updated || state.Offset != T+1 {
+		t.Fatalf("state not updated from kv_out/offset_out: offset=%d", state.Offset)
+	}
+}
+
 // ---------------------------------------------------------------------------
 // Unit tests for Engine.FlowLMStepStateful
 // ---------------------------------------------------------------------------
@@ -353,3 +353,72 @@ func TestGenerateAudioIntegration_StatefulPath_ProducesPlausibleAudio(t *testing
 		t.Errorf("audio RMS=%.6f — output appears to be silence or corrupt (garbled beginning would show as low RMS)", rms)
 	}
 }
+
+// TestFlowLMPrefillStepIntegration_OffsetTracksTextLength runs flow_lm_prefill
+// and then flow_lm_step end to end for several text lengths. The prefill
+// offset must be the actual text length, not the length the graph was traced
+// with, or the first step scatters outside a trimmed cache.
+func TestFlowLMPrefillStepIntegration_OffsetTracksTextLength(t *testing.T) {
+	libPath := ortLibPath(t)
+	manifestPath := textConditionerManifestPath(t)
+
+	engine, err := NewEngine(manifestPath, RunnerConfig{
+		LibraryPath: libPath,
+		APIVersion:  23,
+	})
+	if err != nil {
+		t.Fatalf("NewEngine: %v", err)
+	}
+	defer engine.Close()
+
+	if _, ok := engine.Runner("flow_lm_prefill"); !ok {
+		t.Skip("flow_lm_prefill graph not present in manifest")
+	}
+	if _, ok := engine.Runner("flow_lm_step"); !ok {
+		t.Skip("flow_lm_step graph not present in manifest")
+	}
+
+	rng := rand.New(rand.NewSource(7))
+
+	for _, textLen := range []int64{3, 5, 12} {
+		data := make([]float32, textLen*1024)
+		for i := range data {
+			data[i] = float32(rng.NormFloat64())
+		}
+		emb, err := NewTensor(data, []int64{1, textLen, 1024})
+		if err != nil {
+			t.Fatalf("NewTensor: %v", err)
+		}
+
+		state, err := engine.FlowLMPrefill(context.Background(), emb)
+		if err != nil {
+			t.Fatalf("FlowLMPrefill(T=%d): %v", textLen, err)
+		}
+		if state.Offset != textLen {
+			t.Fatalf("FlowLMPrefill(T=%d) offset = %d, want %d", textLen, state.Offset, textLen)
+		}
+
+		frame := NewBOSSequence()
+		for step := int64(1); step <= 3; step++ {
+			lastHidden, _, err := engine.FlowLMStepStateful(context.Background(), frame, state)
+			if err != nil {
+				t.Fatalf("FlowLMStepStateful(T=%d, step %d): %v", textLen, step, err)
+			}
+			if state.Offset != textLen+step {
+				t.Fatalf("T=%d step %d: offset = %d, want %d", textLen, step, state.Offset, textLen+step)
+			}
+
+			hidden, err := ExtractFloat32(lastHidden)
+			if err != nil {
+				t.Fatalf("ExtractFloat32: %v", err)
+			}
+			for i, v := range hidden {
+				if math.IsNaN(float64(v)) || math.IsInf(float64(v), 0) {
+					t.Fatalf("T=%d step %d: last_hidden[%d] = %v", textLen, step, i, v)
+				}
+			}
+
+			frame, _ = NewTensor(make([]float32, latentDim), []int64{1, 1, latentDim})
+		}
+	}
+}
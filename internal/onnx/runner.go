@@ -116,6 +116,16 @@ func (r *Runner) Name() string {
 	return r.name
 }
 
+// InputNames returns the graph input names declared in the manifest.
+func (r *Runner) InputNames() []string {
+	names := make([]string, len(r.meta.Inputs))
+	for i, in := range r.meta.Inputs {
+		names[i] = in.Name
+	}
+
+	return names
+}
+
 func tensorToORT(runtime *ort.Runtime, t *Tensor) (*ort.Value, error) {
 	switch data := t.Data().(type) {
 	case []float32:
@@ -23,6 +23,10 @@ type Session struct {
 
 	Inputs  []NodeInfo
 	Outputs []NodeInfo
+
+	// MaxSeqLen is the KV state length the graph was traced with, or 0 when
+	// the manifest does not record one.
+	MaxSeqLen int64
 }
 
 type SessionManager struct {
@@ -46,6 +50,8 @@ type onnxGraph struct {
 	Filename string     `json:"filename"`
 	Inputs   []NodeInfo `json:"inputs"`
 	Outputs  []NodeInfo `json:"outputs"`
+	// MaxSeqLen is written by export_onnx.py for graphs with a KV state.
+	MaxSeqLen int64 `json:"max_seq_len"`
 }
 
 func NewSessionManager(manifestPath string) (*SessionManager, error) {
@@ -105,6 +111,8 @@ func NewSessionManager(manifestPath string) (*SessionManager, error) {
 			Path:    sessionPath,
 			Inputs:  append([]NodeInfo(nil), g.Inputs...),
 			Outputs: append([]NodeInfo(nil), g.Outputs...),
+
+			MaxSeqLen: g.MaxSeqLen,
 		}
 		sm.sessions[g.Name] = session
 		sm.order = append(sm.order, g.Name)
@@ -108,3 +108,103 @@ func TestTextConditioner_ReturnsEmbeddings(t *testing.T) {
 		t.Errorf("output shape = %v, want [1 %d 1024]", shape, T)
 	}
 }
+
+func TestTextConditioner_PrefersSmallestFittingBucket(t *testing.T) {
+	const D = 4
+
+	bucketRunner := func(size int64, called *bool) *fakeRunner {
+		return &fakeRunner{
+			name: "text_conditioner_s",
+			fn: func(_ context.Context, inputs map[string]*Tensor) (map[string]*Tensor, error) {
+				*called = true
+
+				tokens, err := ExtractInt64(inputs["tokens"])
+				if err != nil {
+					t.Fatalf("ExtractInt64: %v", err)
+				}
+
+				if int64(len(tokens)) != size {
+					t.Errorf("bucket %d got %d tokens, want padded length", size, len(tokens))
+				}
+
+				out := make([]float32, size*D)
+				for i, id := range tokens {
+					for j := range D {
+						out[i*D+j] = float32(id)
+					}
+				}
+
+				emb, _ := NewTensor(out, []int64{1, size, D})
+
+				return map[string]*Tensor{"text_embeddings": emb}, nil
+			},
+		}
+	}
+
+	var called4, called8 bool
+
+	dynamic := &fakeRunner{
+		name: "text_conditioner",
+		fn: func(_ context.Context, _ map[string]*Tensor) (map[string]*Tensor, error) {
+			t.Error("dynamic graph should not be used when a bucket fits")
+			return map[string]*Tensor{}, nil
+		},
+	}
+	e := engineWithFakeRunners(map[string]runnerIface{
+		"text_conditioner":    dynamic,
+		"text_conditioner_s4": bucketRunner(4, &called4),
+		"text_conditioner_s8": bucketRunner(8, &called8),
+	})
+
+	got, err := e.TextConditioner(context.Background(), []int64{5, 6, 7})
+	if err != nil {
+		t.Fatalf("TextConditioner: %v", err)
+	}
+
+	if !called4 || called8 {
+		t.Errorf("bucket calls: s4=%v s8=%v, want only s4", called4, called8)
+	}
+
+	shape := got.Shape()
+	if len(shape) != 3 || shape[0] != 1 || shape[1] != 3 || shape[2] != D {
+		t.Fatalf("output shape = %v, want [1 3 %d]", shape, D)
+	}
+
+	data, _ := ExtractFloat32(got)
+	if data[0] != 5 || data[len(data)-1] != 7 {
+		t.Errorf("trimmed embeddings = %v, want rows for tokens 5..7", data)
+	}
+}
+
+func TestTextConditioner_FallsBackWhenNoBucketFits(t *testing.T) {
+	var usedDynamic bool
+
+	emb, _ := NewTensor(make([]float32, 5*4), []int64{1, 5, 4})
+	dynamic := &fakeRunner{
+		name: "text_conditioner",
+		fn: func(_ context.Context, _ map[string]*Tensor) (map[string]*Tensor, error) {
+			usedDynamic = true
+			return map[string]*Tensor{"text_embeddings": emb}, nil
+		},
+	}
+	small := &fakeRunner{
+		name: "text_conditioner_s4",
+		fn: func(_ context.Context, _ map[string]*Tensor) (map[string]*Tensor, error) {
+			t.Error("bucket smaller than the token count must not be used")
+			return map[string]*Tensor{}, nil
+		},
+	}
+	e := engineWithFakeRunners(map[string]runnerIface{
+		"text_conditioner":    dynamic,
+		"text_conditioner_s4": small,
+	})
+
+	_, err := e.TextConditioner(context.Background(), []int64{1, 2, 3, 4, 5})
+	if err != nil {
+		t.Fatalf("TextConditioner: %v", err)
+	}
+
+	if !usedDynamic {
+		t.Error("expected fallback to the dynamic text_conditioner graph")
+	}
+}
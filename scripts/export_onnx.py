@@ -13,19 +13,30 @@ Exports:
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
+import gc
+import hashlib
+import io
 import json
+import multiprocessing
 import os
-import shutil
+import queue
 import sys
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Literal
 
+import numpy as np
 import torch
+import torch.nn.functional as F
 
 try:
     import onnx
-    from onnx import TensorProto
+    from onnx import TensorProto, numpy_helper
 except Exception as exc:  # pragma: no cover - runtime dependency
     raise SystemExit(
         "onnx package is required for export_onnx.py. "
@@ -50,6 +61,42 @@ from pocket_tts.modules.stateful_module import init_states
 OPSET_VERSION = 17
 LEGACY_DEFAULT_VARIANT = "b6369a24"
 DEFAULT_LANGUAGE = "english_2026-01"
+# Static INT8 calibration: number of jittered copies of each spec's example inputs.
+CALIBRATION_SAMPLES = 16
+CALIBRATION_JITTER = 0.05
+# Graphs at least this large are quantized with external weight data.
+EXTERNAL_DATA_THRESHOLD_BYTES = 1 << 30
+# --external-data moves initializers of at least this many bytes into
+# <name>.onnx.data, each starting on a page boundary so ORT can mmap them.
+EXTERNAL_DATA_MIN_TENSOR_BYTES = 1024
+EXTERNAL_DATA_ALIGNMENT = 4096
+# Cached calibration-synthesis tensors live under <out-dir>/.calib/.
+CALIBRATION_DIR = ".calib"
+# Bump when capture_calibration_tensors changes what it records, so stale
+# caches are recaptured instead of reused.
+CALIBRATION_FORMAT = 2
+# Cached TTSModel state_dicts (--cache-model) live under <models-dir>/.export-cache/.
+MODEL_CACHE_DIR = ".export-cache"
+
+
+# Per-graph quantization applied when --int8 is set.
+QuantMode = Literal["none", "dynamic_int8", "matmul_nbits"]
+
+# KV-cache I/O of flow_lm_prefill/flow_lm_step: "static" passes the full
+# preallocated [2, 1, max_seq, H, Dh] cache and writes each step in place;
+# "trimmed" passes only the written [2, 1, t, H, Dh] prefix.
+KVLayout = Literal["static", "trimmed"]
+
+# Post-export optimizer applied when --optimize is set: ORT's transformer
+# optimizer for attention graphs, onnxoptimizer fusions for conv graphs.
+OptimizerKind = Literal["none", "transformer", "conv"]
+CONV_OPTIMIZER_PASSES = (
+    "fuse_bn_into_conv",
+    "fuse_add_bias_into_conv",
+    "eliminate_identity",
+    "eliminate_nop_transpose",
+    "fuse_consecutive_transposes",
+)
 
 
 @dataclass
@@ -60,65 +107,175 @@ class ExportSpec:
     output_names: list[str]
     dynamic_axes: dict[str, dict[int, str]]
     example_inputs: tuple[torch.Tensor, ...]
-    module: torch.nn.Module
-
+    # None on a detached() copy, once the graph has been exported.
+    module: torch.nn.Module | None
+    # Quantization policy: small or embedding-dominated graphs lose more to
+    # dequantization overhead than they gain, so they opt out; the
+    # bandwidth-bound LM backbone uses 4-bit weight-only MatMulNBits.
+    # quant_op_types limits dynamic quantization to ops that actually speed
+    # up as integers.
+    quant_mode: QuantMode = "dynamic_int8"
+    quant_op_types: tuple[str, ...] = ("MatMul", "Gemm")
+    # Conv-dominated graphs also quantize Conv, but only where ConvInteger
+    # has VNNI kernels; without them an INT8 Conv is slower than FP32.
+    quant_conv: bool = False
+    optimizer: OptimizerKind = "none"
+    # Prefer the torch.export-based exporter, even without --dynamo (falls
+    # back to TorchScript when onnxscript is missing). Reserved for fully
+    # static graphs, where it fuses more than the tracer and cannot leak
+    # symbolic dims.
+    dynamo: bool = False
+    # Extra keys copied into this graph's manifest entry.
+    manifest_extra: dict[str, Any] = field(default_factory=dict)
+
+    def detached(self) -> ExportSpec:
+        """Copy without the wrapper module, which finalize_graph never touches.
+
+        The wrapper references the live flow LM / Mimi, so holding a spec
+        alive would hold the whole model alive.
+        """
+        return replace(self, module=None)
+
+
+def uniform_fill_value(tensor: torch.Tensor) -> bool | int | float | None:
+    """Return the single value a tensor is filled with, or None if it varies."""
+    if tensor.numel() == 0:
+        return False if tensor.dtype == torch.bool else 0
+    flat = tensor.reshape(-1)
+    first = flat[0]
+    if tensor.is_floating_point() and bool(torch.isnan(first)):
+        return float("nan") if bool(torch.isnan(flat).all()) else None
+    if not bool((flat == first).all()):
+        return None
+    return first.item()
+
+
+class ModelStateTemplate(torch.nn.Module):
+    """Immutable template for a StreamingModule model_state.
+
+    Built once from init_states() in the wrapper's __init__. Uniformly filled
+    tensors (NaN/zero caches, zero offsets) are recreated with torch.full on
+    each forward, which traces to a single ConstantOfShape instead of an
+    initializer plus a copy. Anything else is kept as a non-persistent buffer
+    and copied, because the backbone writes into its state in place.
+    """
 
-def clone_model_state(state: dict[str, dict[str, torch.Tensor]]) -> dict[str, dict[str, torch.Tensor]]:
-    out: dict[str, dict[str, torch.Tensor]] = {}
-    for module_name, module_state in state.items():
-        out[module_name] = {k: v.clone() for k, v in module_state.items()}
-    return out
+    def __init__(self, state: dict[str, dict[str, torch.Tensor]]):
+        super().__init__()
+        self._entries: list[tuple[str, str, str | None, tuple[int, ...], torch.dtype, Any]] = []
+        for module_name, module_state in state.items():
+            for key, value in module_state.items():
+                fill = uniform_fill_value(value)
+                buffer_name = None
+                if fill is None:
+                    buffer_name = f"_state_{len(self._entries)}"
+                    self.register_buffer(buffer_name, value.detach(), persistent=False)
+                self._entries.append((module_name, key, buffer_name, tuple(value.shape), value.dtype, fill))
+
+    def materialize(self) -> dict[str, dict[str, torch.Tensor]]:
+        state: dict[str, dict[str, torch.Tensor]] = {}
+        for module_name, key, buffer_name, shape, dtype, fill in self._entries:
+            if buffer_name is None:
+                value = torch.full(shape, fill, dtype=dtype)
+            else:
+                # Contiguous rather than stride-preserving: the backbone only
+                # ever writes into fresh state.
+                value = getattr(self, buffer_name).clone(memory_format=torch.contiguous_format)
+            state.setdefault(module_name, {})[key] = value
+        return state
+
+
+# (attention module, absolute state name) per KV-cached layer, in layer order.
+KVModules = list[tuple[torch.nn.Module, str]]
+
+
+def kv_cache_modules(flow_lm: torch.nn.Module) -> KVModules:
+    """Walk flow_lm once and list its KV-cached attention layers.
+
+    Wrappers resolve this in __init__ so forward never walks the module tree.
+    """
+    return [
+        (module, module._module_absolute_name)
+        for _, module in flow_lm.named_modules()
+        if hasattr(module, "_cache_backend")
+    ]
 
 
 def extract_kv_tensors(
-    flow_lm: "torch.nn.Module",
+    kv_modules: KVModules,
     state: "dict[str, dict[str, torch.Tensor]]",
     t_written: int,
-) -> "tuple[list[torch.Tensor], torch.Tensor]":
-    """Extract per-layer KV tensors and offset from model_state after prefill.
+) -> "list[torch.Tensor]":
+    """Extract per-layer KV tensors from model_state after prefill.
 
-    Returns (kv_list, offset_tensor) where:
-    - kv_list[i] is the [2, B, t_written, H, Dh] slice of layer i's cache
-    - offset_tensor is int64[1] = t_written
+    kv_list[i] is the [2, B, t_written, H, Dh] slice of layer i's cache. A
+    traced t_written taken from an input shape keeps the slice symbolic.
     """
-    kv_list = []
-    for _module_name, module in flow_lm.named_modules():
-        if not hasattr(module, "_cache_backend"):
-            continue
-        layer_state = state[module._module_absolute_name]
-        # cache shape: [2, B, max_seq, H, Dh]; slice to written portion
-        kv = layer_state["cache"][:, :, :t_written, :, :]
-        kv_list.append(kv)
-    offset = torch.tensor([t_written], dtype=torch.long)
-    return kv_list, offset
-
-
-def rebuild_state_from_kv(
-    flow_lm: "torch.nn.Module",
-    kv_list: "list[torch.Tensor]",
-    offset: "torch.Tensor",
-    max_seq: int,
-) -> "dict[str, dict[str, torch.Tensor]]":
-    """Reconstruct a model_state dict from per-layer KV tensors.
-
-    Pads the cache back to [2, B, max_seq, H, Dh] with NaN.
+    # cache shape: [2, B, max_seq, H, Dh]; slice to written portion
+    return [state[name]["cache"][:, :, :t_written, :, :] for _, name in kv_modules]
+
+
+class StaticKVCacheBackend:
+    """Traceable stand-in for pocket-tts' linear KV-cache backend.
+
+    Upstream writes the cache at a Python int read via offset.item(), which
+    tracing bakes into the graph as a constant. This backend scatters the new
+    keys/values at the offset tensor instead and attends over the whole
+    fixed-capacity cache; slots past offset + t are in every query's future,
+    so the causal mask already drops them.
     """
-    state: dict[str, dict[str, torch.Tensor]] = {}
-    kv_iter = iter(kv_list)
-    for _module_name, module in flow_lm.named_modules():
-        if not hasattr(module, "_cache_backend"):
-            continue
-        kv = next(kv_iter)  # [2, B, t_written, H, Dh]
-        t_written_local = kv.shape[2]
-        b, h, dh = kv.shape[1], kv.shape[3], kv.shape[4]
-        cache = torch.full((2, b, max_seq, h, dh), float("nan"), dtype=kv.dtype)
-        cache[:, :, :t_written_local, :, :] = kv
-        abs_name = module._module_absolute_name
-        state[abs_name] = {
-            "cache": cache,
-            "offset": offset.expand(b).clone(),
-        }
-    return state
+
+    requires_state = True
+
+    def __init__(self, backend: Any):
+        self._backend = backend
+
+    def rope_offset(self, state: Any, batch_size: int, device: torch.device) -> torch.Tensor:
+        return self._backend.rope_offset(state, batch_size, device)
+
+    def append_and_get(
+        self, k: torch.Tensor, v: torch.Tensor, state: dict[str, torch.Tensor]
+    ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        cache, offset = state["cache"], state["offset"]
+        b, t, h, dh = k.shape
+        positions = offset.view(-1)[:1] + torch.arange(t, dtype=torch.long)
+        index = positions.view(1, 1, t, 1, 1).expand(2, b, t, h, dh)
+        cache = cache.scatter(2, index, torch.stack([k, v]))
+        state["cache"] = cache
+
+        pos_k = torch.arange(cache.shape[2], dtype=torch.long).view(1, -1).expand(b, -1)
+        return cache[0].permute(0, 2, 1, 3), cache[1].permute(0, 2, 1, 3), pos_k, offset
+
+
+@contextlib.contextmanager
+def static_kv_cache(kv_modules: KVModules) -> Iterator[None]:
+    """Temporarily route the KV-cached layers through StaticKVCacheBackend."""
+    modules = [module for module, _ in kv_modules]
+    saved = [m._cache_backend for m in modules]
+    try:
+        for module, backend in zip(modules, saved):
+            module._cache_backend = StaticKVCacheBackend(backend)
+        yield
+    finally:
+        for module, backend in zip(modules, saved):
+            module._cache_backend = backend
+
+
+def state_caches(
+    kv_modules: KVModules, state: dict[str, dict[str, torch.Tensor]]
+) -> list[torch.Tensor]:
+    """Per-layer caches of model_state, in layer order, without slicing."""
+    return [state[name]["cache"] for _, name in kv_modules]
+
+
+def static_kv_state(
+    kv_modules: KVModules, kv_list: list[torch.Tensor], offset: torch.Tensor
+) -> dict[str, dict[str, torch.Tensor]]:
+    """Wrap full-capacity per-layer caches as a model_state without copying."""
+    return {
+        name: {"cache": kv, "offset": offset.expand(kv.shape[1])}
+        for (_, name), kv in zip(kv_modules, kv_list)
+    }
 
 
 class TextConditionerWrapper(torch.nn.Module):
@@ -130,21 +287,43 @@ class TextConditionerWrapper(torch.nn.Module):
         return self.conditioner(TokenizedText(tokens=tokens))
 
 
+def apply_bos(
+    sequence: torch.Tensor, bos_emb: torch.Tensor, bos_mask: torch.Tensor | None = None
+) -> torch.Tensor:
+    """Substitute bos_emb at BOS positions of a [B, S, ldim] sequence.
+
+    Without a mask, BOS positions are the caller's NaN sentinels. With a
+    float [B, S] mask (1 at BOS), the swap is plain arithmetic, so the graph
+    carries no IsNaN/Where pair and needs no NaN-safe inputs.
+    """
+    if bos_mask is None:
+        return torch.where(torch.isnan(sequence), bos_emb, sequence)
+    return sequence + bos_mask.unsqueeze(-1) * (bos_emb - sequence)
+
+
 class FlowLMMainWrapper(torch.nn.Module):
     def __init__(self, model: TTSModel, max_sequence_length: int = 256):
         super().__init__()
         self.flow_lm = model.flow_lm
-        self.base_state = init_states(self.flow_lm, batch_size=1, sequence_length=max_sequence_length)
+        self.base_state = ModelStateTemplate(
+            init_states(self.flow_lm, batch_size=1, sequence_length=max_sequence_length)
+        )
         # Register bos_emb as a buffer so it is baked into the ONNX graph as a constant.
-        # The Go caller signals BOS positions by passing NaN; we replace them here so that
-        # the torch.isnan() branch is always traced (example input contains NaN).
-        self.register_buffer("bos_emb", model.flow_lm.bos_emb.detach().clone())
-
-    def forward(self, sequence: torch.Tensor, text_embeddings: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
-        state = clone_model_state(self.base_state)
-        # Replace NaN BOS positions with the learned bos_emb embedding.
+        # The Go caller marks BOS positions either with NaN frames (the example then
+        # contains NaN, so the torch.isnan() branch is traced) or, when exported with
+        # --bos-mask, with the bos_mask input; apply_bos swaps in bos_emb for both.
+        self.register_buffer("bos_emb", model.flow_lm.bos_emb.detach())
+
+    def forward(
+        self,
+        sequence: torch.Tensor,
+        text_embeddings: torch.Tensor,
+        bos_mask: torch.Tensor | None = None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        state = self.base_state.materialize()
+        # Replace BOS positions with the learned bos_emb embedding.
         # bos_emb is [ldim]; broadcast to match sequence shape [B, S, ldim].
-        sequence = torch.where(torch.isnan(sequence), self.bos_emb, sequence)
+        sequence = apply_bos(sequence, self.bos_emb, bos_mask)
         projected = self.flow_lm.input_linear(sequence)
         hidden = self.flow_lm.backbone(projected, text_embeddings, sequence, model_state=state)
         last_hidden = hidden[:, -1, :]
@@ -157,38 +336,61 @@ class FlowLMPrefillWrapper(torch.nn.Module):
     returns per-layer KV-cache tensors for use in incremental AR generation.
 
     Called once per synthesis chunk before the AR loop. Returns kv_0..kv_{N-1}
-    (each [2, 1, T, H, Dh]) and offset (int64[1]=T).
+    and offset (int64[1]=T). With the static layout each kv_i is the full
+    zero-padded [2, 1, max_seq, H, Dh] cache; with the trimmed layout it is
+    the written [2, 1, T, H, Dh] prefix. With stack_kv the layers are returned
+    as one [L, 2, 1, S, H, Dh] tensor instead.
     """
 
-    def __init__(self, model: TTSModel, max_sequence_length: int = 256):
+    def __init__(
+        self,
+        model: TTSModel,
+        max_sequence_length: int = 256,
+        kv_layout: KVLayout = "static",
+        stack_kv: bool = False,
+        kv_modules: KVModules | None = None,
+    ):
         super().__init__()
         self.flow_lm = model.flow_lm
         self.max_sequence_length = max_sequence_length
-        self._num_kv_layers = sum(
-            1 for _, m in model.flow_lm.named_modules() if hasattr(m, "_cache_backend")
-        )
+        self.kv_layout = kv_layout
+        self.stack_kv = stack_kv
+        self._kv_modules = kv_modules if kv_modules is not None else kv_cache_modules(self.flow_lm)
+        state = init_states(self.flow_lm, batch_size=1, sequence_length=max_sequence_length)
+        if kv_layout == "static":
+            # Unwritten slots must be finite: masked attention weights are zero,
+            # but 0 * NaN is still NaN once the step graph attends the full cache.
+            for _, name in self._kv_modules:
+                state[name]["cache"] = torch.zeros_like(state[name]["cache"])
+        self.base_state = ModelStateTemplate(state)
 
     def forward(self, text_embeddings: torch.Tensor) -> tuple:
         """
         Args:
             text_embeddings: [1, T, 1024]
         Returns:
-            kv_0, kv_1, ..., kv_{N-1}: [2, 1, T, H, Dh] each
+            kv_0, kv_1, ..., kv_{N-1}: [2, 1, max_seq, H, Dh] (static) or [2, 1, T, H, Dh] (trimmed)
             offset: int64[1] = T
         """
         T = text_embeddings.shape[1]
-        state = init_states(self.flow_lm, batch_size=1, sequence_length=self.max_sequence_length)
+        state = self.base_state.materialize()
+        # Count T from the input rather than baking the traced example length;
+        # torch.tensor([T]) would become a constant in either layout.
+        offset = torch.ones_like(text_embeddings[0, :, 0], dtype=torch.long).sum().view(1)
 
-        # Run backbone with text-only (empty sequence input).
-        # backbone() does: input_ = cat([text_embeddings, sequence_input], dim=1)
-        # then transformer, then strips the sequence prefix from output.
-        # With empty sequence the stripped portion is empty, so no output is needed.
-        empty_seq = torch.zeros(1, 0, self.flow_lm.ldim, dtype=text_embeddings.dtype)
-        projected = self.flow_lm.input_linear(empty_seq)
-        self.flow_lm.backbone(projected, text_embeddings, empty_seq, model_state=state)
+        # Only the KV writes matter, so call the transformer directly: backbone()
+        # would add input_linear over an empty sequence, a cat with it, and an
+        # out_norm whose result is discarded.
+        if self.kv_layout == "trimmed":
+            self.flow_lm.transformer(text_embeddings, state)
+            return self._pack(extract_kv_tensors(self._kv_modules, state, T)) + (offset,)
 
-        kv_list, offset = extract_kv_tensors(self.flow_lm, state, T)
-        return tuple(kv_list) + (offset,)
+        with static_kv_cache(self._kv_modules):
+            self.flow_lm.transformer(text_embeddings, state)
+        return self._pack(state_caches(self._kv_modules, state)) + (offset,)
+
+    def _pack(self, kv_list: list[torch.Tensor]) -> tuple[torch.Tensor, ...]:
+        return (torch.stack(kv_list),) if self.stack_kv else tuple(kv_list)
 
 
 class FlowLMStepWrapper(torch.nn.Module):
@@ -197,55 +399,75 @@ class FlowLMStepWrapper(torch.nn.Module):
     Accepts sequence_frame [1, 1, 32], per-layer KV tensors, and offset as inputs.
     Returns last_hidden [1, 1024], eos_logits [1, 1], updated KV tensors, and
     updated offset. The Go caller maintains the KV state between steps.
+
+    With the static layout the KV tensors keep their [2, 1, max_seq, H, Dh]
+    shape and the step scatters one position at `offset`; the trimmed layout
+    pads the [2, 1, S, H, Dh] prefix by one slot and scatters there.
+    With stack_kv all layers travel as one [L, 2, 1, S, H, Dh] kv/kv_out pair.
     """
 
-    def __init__(self, model: TTSModel, max_sequence_length: int = 256):
+    def __init__(
+        self,
+        model: TTSModel,
+        max_sequence_length: int = 256,
+        kv_layout: KVLayout = "static",
+        stack_kv: bool = False,
+        bos_mask: bool = False,
+        kv_modules: KVModules | None = None,
+    ):
         super().__init__()
         self.flow_lm = model.flow_lm
         self.max_sequence_length = max_sequence_length
-        self.register_buffer("bos_emb", model.flow_lm.bos_emb.detach().clone())
-        self._num_kv_layers = sum(
-            1 for _, m in model.flow_lm.named_modules() if hasattr(m, "_cache_backend")
-        )
+        self.kv_layout = kv_layout
+        self.stack_kv = stack_kv
+        self.bos_mask = bos_mask
+        self.register_buffer("bos_emb", model.flow_lm.bos_emb.detach())
+        self._kv_modules = kv_modules if kv_modules is not None else kv_cache_modules(self.flow_lm)
 
     def forward(self, sequence_frame: torch.Tensor, *args: torch.Tensor) -> tuple:
         """
         Args:
             sequence_frame: [1, 1, 32] — NaN for BOS, latent frame thereafter
-            *args: kv_0, kv_1, ..., kv_{N-1}, offset
-                   kv_i: [2, 1, S, H, Dh]
+            *args: kv_0, kv_1, ..., kv_{N-1}, offset (or kv, offset with stack_kv),
+                   then bos_mask [1, 1] when exported with bos_mask
+                   kv_i: [2, 1, max_seq, H, Dh] (static) or [2, 1, S, H, Dh] (trimmed)
                    offset: int64[1]
         Returns:
             last_hidden: [1, 1024]
             eos_logits: [1, 1]
-            kv_0, ..., kv_{N-1}: updated [2, 1, S+1, H, Dh]
+            kv_0, ..., kv_{N-1}: updated, same shape (static) or [2, 1, S+1, H, Dh] (trimmed)
             offset: updated int64[1]
         """
-        kv_list = list(args[:-1])
+        bos_mask = None
+        if self.bos_mask:
+            args, bos_mask = args[:-1], args[-1]
+        kv_list = list(args[0].unbind(0)) if self.stack_kv else list(args[:-1])
         offset = args[-1]
 
-        # Reconstruct state dict from KV tensors + offset.
-        state = rebuild_state_from_kv(
-            self.flow_lm, kv_list, offset, self.max_sequence_length
-        )
-
-        # Replace NaN BOS positions with the learned bos_emb embedding.
-        frame = torch.where(torch.isnan(sequence_frame), self.bos_emb, sequence_frame)
+        # Replace BOS positions with the learned bos_emb embedding.
+        frame = apply_bos(sequence_frame, self.bos_emb, bos_mask)
 
         # Run single AR step: empty text embeddings (already in KV cache from prefill).
         projected = self.flow_lm.input_linear(frame)
         empty_text = torch.zeros(1, 0, self.flow_lm.dim, dtype=frame.dtype)
-        hidden = self.flow_lm.backbone(projected, empty_text, frame, model_state=state)
 
-        if self.flow_lm.out_norm:
-            hidden = self.flow_lm.out_norm(hidden)
+        if self.kv_layout == "trimmed":
+            # Grow each [2, 1, S, H, Dh] prefix by the one slot this step
+            # writes; the static backend scatters it at the offset tensor, so
+            # the S + 1 output length stays symbolic instead of being baked
+            # from offset.item() at trace time.
+            kv_list = [F.pad(kv, (0, 0, 0, 0, 0, 1)) for kv in kv_list]
+        state = static_kv_state(self._kv_modules, kv_list, offset)
+        with static_kv_cache(self._kv_modules):
+            hidden = self.flow_lm.backbone(projected, empty_text, frame, model_state=state)
+
+        # backbone() already applies out_norm.
         last_hidden = hidden[:, -1, :]
         eos_logits = self.flow_lm.out_eos(last_hidden)
 
-        # Extract updated KV (offset is now offset+1).
-        new_t = int(offset.item()) + 1
-        new_kv_list, new_offset = extract_kv_tensors(self.flow_lm, state, new_t)
-        return (last_hidden, eos_logits) + tuple(new_kv_list) + (new_offset,)
+        new_kv_list = state_caches(self._kv_modules, state)
+        new_kv = (torch.stack(new_kv_list),) if self.stack_kv else tuple(new_kv_list)
+        return (last_hidden, eos_logits) + new_kv + (offset + 1,)
 
 
 class FlowLMFlowWrapper(torch.nn.Module):
@@ -258,18 +480,34 @@ class FlowLMFlowWrapper(torch.nn.Module):
 
 
 class LatentToMimiWrapper(torch.nn.Module):
+    """Denormalizes flow latents and projects them to the Mimi decoder dim.
+
+    quantizer.output_proj is a pointwise Conv1d, so the affine denorm
+    (latent * emb_std + emb_mean) folds into its parameters:
+    W' = W * emb_std and b' = W @ emb_mean + b. The exported graph is then a
+    single Conv instead of Mul -> Add -> Transpose -> Conv.
+    """
+
     def __init__(self, model: TTSModel):
         super().__init__()
-        self.register_buffer("emb_std", model.flow_lm.emb_std.detach().clone())
-        self.register_buffer("emb_mean", model.flow_lm.emb_mean.detach().clone())
-        self.quantizer_proj = model.mimi.quantizer.output_proj
+        proj = model.mimi.quantizer.output_proj
+        if proj.kernel_size != (1,) or proj.groups != 1:
+            raise ValueError(
+                f"latent_to_mimi fusion expects a pointwise Conv1d, got "
+                f"kernel_size={proj.kernel_size} groups={proj.groups}"
+            )
+        weight = proj.weight.detach()  # [mimi_dim, ldim, 1]
+        emb_std = model.flow_lm.emb_std.detach().reshape(1, -1, 1)
+        emb_mean = model.flow_lm.emb_mean.detach().reshape(-1)
+        bias = weight[:, :, 0] @ emb_mean
+        if proj.bias is not None:
+            bias = bias + proj.bias.detach()
+        self.register_buffer("fused_weight", weight * emb_std)
+        self.register_buffer("fused_bias", bias)
 
     def forward(self, latent: torch.Tensor) -> torch.Tensor:
-        # latent: [B, T, ldim]
-        # Apply flow normalization stats, then quantizer projection to Mimi decoder dim.
-        denorm = latent * self.emb_std + self.emb_mean
-        transposed = denorm.transpose(-1, -2)  # [B, ldim, T]
-        return self.quantizer_proj(transposed)  # [B, mimi_dim, T]
+        # latent: [B, T, ldim] -> [B, mimi_dim, T]
+        return F.conv1d(latent.transpose(-1, -2), self.fused_weight, self.fused_bias)
 
 
 class MimiEncoderWrapper(torch.nn.Module):
@@ -287,36 +525,241 @@ class MimiDecoderWrapper(torch.nn.Module):
         self.mimi = model.mimi
         mimi_steps_per_latent = int(round(model.mimi.encoder_frame_rate / model.mimi.frame_rate))
         decoder_sequence_length = max_latent_steps * mimi_steps_per_latent
-        self.base_state = init_states(
-            self.mimi, batch_size=1, sequence_length=decoder_sequence_length
+        self.base_state = ModelStateTemplate(
+            init_states(self.mimi, batch_size=1, sequence_length=decoder_sequence_length)
         )
 
     def forward(self, latent: torch.Tensor) -> torch.Tensor:
-        state = clone_model_state(self.base_state)
+        state = self.base_state.materialize()
         return self.mimi.decode_from_latent(latent, state)
 
 
-def export_one(spec: ExportSpec, out_dir: Path) -> Path:
+def build_dynamic_shapes(spec: ExportSpec) -> tuple[dict[int, Any] | None, ...]:
+    """Translate legacy dynamic_axes into torch.export dynamic_shapes.
+
+    Axes sharing a name (e.g. text_tokens) map to one Dim, so the exporter
+    knows they are equal. torch.export specializes any example dim of size 1,
+    so a dynamic axis must be traced with a larger example.
+    """
+    dims: dict[str, Any] = {}
+    shapes: list[dict[int, Any] | None] = []
+    for name, example in zip(spec.input_names, spec.example_inputs):
+        axes = spec.dynamic_axes.get(name)
+        if not axes:
+            shapes.append(None)
+            continue
+        entry: dict[int, Any] = {}
+        for axis, dim_name in axes.items():
+            if example.shape[axis] <= 1:
+                raise ValueError(
+                    f"{spec.name}: dynamic axis {dim_name!r} of input {name!r} needs an example "
+                    f"size > 1 for --dynamo, got {example.shape[axis]}"
+                )
+            if dim_name not in dims:
+                dims[dim_name] = torch.export.Dim(dim_name, min=1)
+            entry[axis] = dims[dim_name]
+        shapes.append(entry)
+    return tuple(shapes)
+
+
+def write_bytes_atomic(path: Path, data: bytes | memoryview) -> None:
+    """Write data to a sibling temp file in one call and rename it over path."""
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def check_static_io(name: str, path: Path) -> None:
+    """Fail if a graph exported without dynamic axes still has symbolic dims."""
+    for kind, values in read_graph_io(path).items():
+        for value in values:
+            symbolic = [d.dim_param for d in value.type.tensor_type.shape.dim if d.dim_param]
+            if symbolic:
+                raise RuntimeError(f"{name}: static {kind} {value.name!r} exported with symbolic dims {symbolic}")
+
+
+@functools.lru_cache(maxsize=1)
+def onnxscript_available() -> bool:
+    try:
+        import onnxscript  # noqa: F401
+    except Exception:  # pragma: no cover - runtime dependency
+        return False
+    return True
+
+
+def use_dynamo_exporter(spec: ExportSpec, requested: bool) -> bool:
+    """Whether `spec` is exported with the torch.export-based exporter.
+
+    --dynamo always selects it. A spec's own preference only applies when
+    onnxscript, which that exporter needs, is importable; otherwise the spec
+    is traced with TorchScript like the rest.
+    """
+    return requested or (spec.dynamo and onnxscript_available())
+
+
+def export_one(spec: ExportSpec, out_dir: Path, dynamo: bool = False) -> Path:
     out_path = out_dir / spec.filename
     spec.module.eval()
 
+    if spec.dynamo and not dynamo and not onnxscript_available():
+        print(f"onnxscript unavailable; exporting {spec.name} with TorchScript instead of dynamo")
+    dynamo = use_dynamo_exporter(spec, dynamo)
     with torch.no_grad():
-        torch.onnx.export(
-            spec.module,
-            spec.example_inputs,
-            out_path.as_posix(),
-            input_names=spec.input_names,
-            output_names=spec.output_names,
-            dynamic_axes=spec.dynamic_axes,
-            opset_version=OPSET_VERSION,
-            do_constant_folding=True,
-            dynamo=False,
-        )
+        if dynamo:
+            # torch.export-based exporter: cleaner symbolic shapes and fewer
+            # Shape/Gather/Unsqueeze chains than the TorchScript tracer.
+            onnx_program = torch.onnx.export(
+                spec.module,
+                spec.example_inputs,
+                input_names=spec.input_names,
+                output_names=spec.output_names,
+                dynamic_shapes=build_dynamic_shapes(spec),
+                opset_version=OPSET_VERSION,
+                dynamo=True,
+                optimize=True,
+                verbose=False,
+            )
+            tmp = out_path.with_suffix(".export.tmp.onnx")
+            onnx_program.save(tmp.as_posix())
+            os.replace(tmp, out_path)
+            if not spec.dynamic_axes:
+                check_static_io(spec.name, out_path)
+        else:
+            # Serialize in memory and publish with one write + rename: the
+            # tracer's many small writes become one, and a crashed export
+            # never leaves a truncated graph behind.
+            buf = io.BytesIO()
+            torch.onnx.export(
+                spec.module,
+                spec.example_inputs,
+                buf,
+                input_names=spec.input_names,
+                output_names=spec.output_names,
+                dynamic_axes=spec.dynamic_axes,
+                opset_version=OPSET_VERSION,
+                do_constant_folding=True,
+                dynamo=False,
+            )
+            write_bytes_atomic(out_path, buf.getbuffer())
     print(f"exported {spec.name} -> {out_path}")
     return out_path
 
 
-def quantize_int8(path: Path) -> None:
+def needs_external_data(path: Path) -> bool:
+    """Whether a rewritten graph should spill weights to an external file.
+
+    Protobuf caps a single message at 2 GiB; stay well below it so the
+    quantizer's intermediate copies do not hit the limit either.
+    """
+    return path.stat().st_size >= EXTERNAL_DATA_THRESHOLD_BYTES
+
+
+def external_data_name(path: Path) -> str | None:
+    """Side file a graph's initializers point at, or None if self-contained."""
+    locations = {
+        entry.value
+        for init in onnx.load(path.as_posix(), load_external_data=False).graph.initializer
+        if init.data_location == TensorProto.EXTERNAL
+        for entry in init.external_data
+        if entry.key == "location"
+    }
+    if len(locations) > 1:
+        raise RuntimeError(f"{path.name}: external data split across {sorted(locations)}")
+    return next(iter(locations), None)
+
+
+def publish_graph(tmp_graph: Path, path: Path) -> str | None:
+    """Rename a rewritten graph over `path`, moving its external data along.
+
+    Tools writing to a temp path name the side file after it, so the graph
+    is repointed at <name>.onnx.data before anything is renamed. Both files
+    are complete by then, so they only disagree between the two renames;
+    the data goes first. A self-contained graph removes any side file left
+    from an earlier step. Returns the side file's name, or None.
+    """
+    tmp_data_name = external_data_name(tmp_graph)
+    data_path = path.with_name(path.name + ".data")
+    if tmp_data_name is None:
+        os.replace(tmp_graph, path)
+        data_path.unlink(missing_ok=True)
+        return None
+
+    if tmp_data_name != data_path.name:
+        model = onnx.load(tmp_graph.as_posix(), load_external_data=False)
+        for init in model.graph.initializer:
+            for entry in init.external_data:
+                if entry.key == "location":
+                    entry.value = data_path.name
+        tmp_graph.write_bytes(model.SerializeToString())
+    os.replace(tmp_graph.with_name(tmp_data_name), data_path)
+    os.replace(tmp_graph, path)
+    return data_path.name
+
+
+def preprocess_for_quantization(path: Path) -> Path:
+    """Run ORT's quantization pre-processing and return the pre-processed path.
+
+    quant_pre_process applies symbolic shape inference and ORT graph
+    optimizations so the quantizer sees fused nodes, which avoids redundant
+    QDQ/dequantize pairs around ops that would otherwise be fused later.
+    The caller is responsible for deleting the returned file.
+    """
+    try:
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--int8 requested but onnxruntime quantization is unavailable; "
+            "install onnxruntime in the selected python environment"
+        ) from exc
+
+    pre_path = path.with_suffix(".pre.onnx")
+    quant_pre_process(
+        path.as_posix(),
+        pre_path.as_posix(),
+        skip_optimization=False,
+        skip_onnx_shape=False,
+        skip_symbolic_shape=False,
+        auto_merge=True,
+    )
+    return pre_path
+
+
+def quantize_matmul_nbits(path: Path, bits: int = 4, block_size: int = 32) -> None:
+    """Quantize MatMul weights to blockwise 4-bit (weight-only MatMulNBits)."""
+    try:
+        from onnxruntime.quantization.matmul_nbits_quantizer import MatMulNBitsQuantizer
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--int8 requested but onnxruntime MatMulNBitsQuantizer is unavailable; "
+            "install onnxruntime>=1.17 in the selected python environment"
+        ) from exc
+
+    quantizer = MatMulNBitsQuantizer(
+        onnx.load(path.as_posix()),
+        block_size=block_size,
+        is_symmetric=True,
+        accuracy_level=4,
+        bits=bits,
+    )
+    quantizer.process()
+    tmp = path.with_suffix(".nbits.tmp.onnx")
+    quantizer.model.save_model_to_file(tmp.as_posix(), use_external_data_format=needs_external_data(path))
+    publish_graph(tmp, path)
+    print(f"quantized {bits}-bit MatMulNBits -> {path}")
+
+
+def quantize_int8(
+    path: Path,
+    mode: QuantMode = "dynamic_int8",
+    op_types: tuple[str, ...] = ("MatMul", "Gemm"),
+) -> None:
+    if mode == "none":
+        return
+    if mode == "matmul_nbits":
+        quantize_matmul_nbits(path)
+        return
+
     try:
         from onnxruntime.quantization import QuantType, quantize_dynamic
     except Exception as exc:  # pragma: no cover - runtime dependency
@@ -325,27 +768,647 @@ def quantize_int8(path: Path) -> None:
             "install onnxruntime in the selected python environment"
         ) from exc
 
+    pre_path = preprocess_for_quantization(path)
     tmp = path.with_suffix(".int8.tmp.onnx")
-    quantize_dynamic(path.as_posix(), tmp.as_posix(), weight_type=QuantType.QInt8)
-    shutil.move(tmp.as_posix(), path.as_posix())
+    try:
+        quantize_dynamic(
+            pre_path.as_posix(),
+            tmp.as_posix(),
+            weight_type=QuantType.QInt8,
+            op_types_to_quantize=list(op_types),
+            use_external_data_format=needs_external_data(path),
+        )
+    finally:
+        pre_path.unlink(missing_ok=True)
+    publish_graph(tmp, path)
     print(f"quantized INT8 -> {path}")
 
 
-def tensor_shape_to_json(tensor_type: onnx.TypeProto.Tensor) -> list[Any]:
-    dims = []
-    for d in tensor_type.shape.dim:
-        if d.dim_param:
-            dims.append(d.dim_param)
-        elif d.dim_value:
-            dims.append(int(d.dim_value))
-        else:
-            dims.append("?")
-    return dims
+@functools.lru_cache(maxsize=1)
+def cpu_has_vnni() -> bool:
+    """Report whether this CPU advertises AVX-512 VNNI or AVX-VNNI."""
+    try:
+        cpuinfo = Path("/proc/cpuinfo").read_text(encoding="utf-8")
+    except OSError:  # non-Linux hosts: assume no VNNI
+        return False
+    for line in cpuinfo.splitlines():
+        if line.startswith("flags"):
+            flags = set(line.partition(":")[2].split())
+            return bool(flags & {"avx512_vnni", "avx_vnni"})
+    return False
+
+
+def resolve_quant_ops(spec: ExportSpec, int8_conv: str = "auto") -> tuple[str, ...]:
+    """Op types to INT8-quantize for a spec under the --int8-conv policy."""
+    if not spec.quant_conv or "Conv" in spec.quant_op_types:
+        return spec.quant_op_types
+    if int8_conv == "on" or (int8_conv == "auto" and cpu_has_vnni()):
+        return (*spec.quant_op_types, "Conv")
+    return spec.quant_op_types
+
+
+def tune_intra_op_threads(
+    path: Path,
+    example_inputs: tuple[torch.Tensor, ...],
+    input_names: list[str],
+    repeats: int = 3,
+) -> int:
+    """Time the graph on its example inputs and return the fastest intra-op thread count."""
+    try:
+        import onnxruntime as ort
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--tune-threads requested but onnxruntime is unavailable; "
+            "install onnxruntime in the selected python environment"
+        ) from exc
+
+    feed_all = {name: tensor.numpy() for name, tensor in zip(input_names, example_inputs)}
+    candidates = sorted({1, 2, 4, os.cpu_count() or 1})
+    best_threads, best_time = 1, float("inf")
+    for threads in candidates:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        session = ort.InferenceSession(path.as_posix(), options, providers=["CPUExecutionProvider"])
+        # Exported graphs may drop inputs that constant-folded away.
+        feed = {i.name: feed_all[i.name] for i in session.get_inputs() if i.name in feed_all}
+        session.run(None, feed)  # warm-up
+        elapsed = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            session.run(None, feed)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        if elapsed < best_time:
+            best_threads, best_time = threads, elapsed
+        del session
+    print(f"tuned {path.name}: intra_op_num_threads={best_threads} ({best_time * 1000:.1f} ms)")
+    return best_threads
+
+
+def quantize_static_from_examples(
+    path: Path,
+    example_inputs: tuple[torch.Tensor, ...],
+    input_names: list[str],
+    op_types: tuple[str, ...] = ("MatMul", "Gemm"),
+    per_channel: bool = False,
+) -> None:
+    """Apply static QDQ INT8 quantization calibrated on jittered example inputs.
+
+    op_types comes from resolve_quant_ops, so the static path follows the same
+    per-spec op list and --int8-conv policy as dynamic quantization.
+
+    Unlike quantize_dynamic, activation scales are fixed at export time, so ORT
+    can run integer-only QLinearMatMul/QLinearConv kernels instead of
+    recomputing quantization parameters on every inference.
+    """
+    try:
+        from onnxruntime.quantization import (
+            CalibrationDataReader,
+            QuantFormat,
+            QuantType,
+            quantize_static,
+        )
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--int8-mode=static requested but onnxruntime quantization is unavailable; "
+            "install onnxruntime in the selected python environment"
+        ) from exc
 
+    class ExampleCalibrationReader(CalibrationDataReader):
+        def __init__(self) -> None:
+            gen = torch.Generator().manual_seed(0)
+            batches = []
+            for _ in range(CALIBRATION_SAMPLES):
+                feed = {}
+                for name, tensor in zip(input_names, example_inputs):
+                    if tensor.is_floating_point():
+                        noise = torch.randn(tensor.shape, generator=gen, dtype=tensor.dtype)
+                        tensor = tensor + noise * CALIBRATION_JITTER
+                    feed[name] = tensor.numpy()
+                batches.append(feed)
+            self._batches = iter(batches)
+
+        def get_next(self) -> dict[str, Any] | None:
+            return next(self._batches, None)
+
+    pre_path = preprocess_for_quantization(path)
+    tmp = path.with_suffix(".int8.tmp.onnx")
+    try:
+        quantize_static(
+            pre_path.as_posix(),
+            tmp.as_posix(),
+            ExampleCalibrationReader(),
+            quant_format=QuantFormat.QDQ,
+            per_channel=per_channel,
+            activation_type=QuantType.QInt8,
+            weight_type=QuantType.QInt8,
+            op_types_to_quantize=list(op_types),
+            use_external_data_format=needs_external_data(path),
+        )
+    finally:
+        pre_path.unlink(missing_ok=True)
+    publish_graph(tmp, path)
+    print(f"quantized static INT8 -> {path}")
 
-def inspect_onnx(path: Path) -> dict[str, Any]:
+
+def convert_fp16(path: Path) -> Path:
+    """Write an FP16 copy of an FP32 graph next to it as <stem>.fp16.onnx.
+
+    Graph inputs/outputs stay FP32 so callers feed the same tensors to either
+    variant. LayerNormalization and Softmax stay FP32 for numerical headroom.
+    """
+    try:
+        from onnxconverter_common import float16
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--fp16 requested but onnxconverter-common is unavailable; "
+            "install onnxconverter-common in the selected python environment"
+        ) from exc
+
+    out_path = path.with_suffix(".fp16.onnx")
+    model16 = float16.convert_float_to_float16(
+        onnx.load(path.as_posix()),
+        keep_io_types=True,
+        disable_shape_infer=False,
+        op_block_list=list(float16.DEFAULT_OP_BLOCK_LIST) + ["LayerNormalization", "Softmax"],
+    )
+    onnx.save(model16, out_path.as_posix())
+    print(f"converted FP16 -> {out_path}")
+    return out_path
+
+
+# Small float initializers (scales, norms, biases) are not worth a Cast each.
+BF16_MIN_ELEMENTS = 1024
+
+
+def convert_bf16(path: Path) -> Path:
+    """Write a BF16-weight copy of an FP32 graph next to it as <stem>.bf16.onnx.
+
+    ORT's CPU provider has almost no BF16 kernels, so this is weight-only:
+    large FP32 initializers are stored as BF16 (round-to-nearest-even) and
+    widened back with a Cast at load time. The file and download halve while
+    compute, inputs and outputs stay FP32, which keeps flow matching at FP32
+    quality; use --fp16 for FP16 compute.
+    """
     model = onnx.load(path.as_posix())
     graph = model.graph
+    casts = []
+    for init in graph.initializer:
+        if init.data_type != TensorProto.FLOAT or np.prod(init.dims, dtype=np.int64) < BF16_MIN_ELEMENTS:
+            continue
+        bits = numpy_helper.to_array(init).astype(np.float32, copy=False).view(np.uint32)
+        rounded = ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+        name = init.name
+        init.name = f"{name}_bf16"
+        init.data_type = TensorProto.BFLOAT16
+        init.ClearField("float_data")
+        init.raw_data = rounded.tobytes()
+        casts.append(onnx.helper.make_node("Cast", [init.name], [name], to=TensorProto.FLOAT, name=f"{name}_to_fp32"))
+    # Casts must precede their consumers for a topologically sorted graph.
+    nodes = casts + list(graph.node)
+    graph.ClearField("node")
+    graph.node.extend(nodes)
+
+    out_path = path.with_suffix(".bf16.onnx")
+    onnx.save(model, out_path.as_posix(), save_as_external_data=needs_external_data(path))
+    print(f"converted BF16 weights ({len(casts)} initializers) -> {out_path}")
+    return out_path
+
+
+def simplify_onnx(path: Path) -> dict[str, int]:
+    """Simplify a graph in place with onnxsim and return node counts."""
+    try:
+        import onnxsim
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--simplify requested but onnxsim is unavailable; "
+            "install onnxsim in the selected python environment"
+        ) from exc
+
+    model = onnx.load(path.as_posix())
+    nodes_before = len(model.graph.node)
+    simplified, ok = onnxsim.simplify(model, overwrite_input_shapes=None, skip_fuse_bn=False)
+    if not ok:
+        raise RuntimeError(f"onnxsim could not validate simplified graph: {path}")
+    onnx.checker.check_model(simplified, full_check=True)
+    write_bytes_atomic(path, simplified.SerializeToString())
+    nodes_after = len(simplified.graph.node)
+    print(f"simplified {path.name}: {nodes_before} -> {nodes_after} nodes")
+    return {"num_nodes_before": nodes_before, "num_nodes_after": nodes_after}
+
+
+def pre_optimize_onnx(path: Path) -> None:
+    """Replace a graph with the one ORT produces after its own graph optimization.
+
+    Every later InferenceSession then starts from the already-fused graph
+    instead of redoing the optimization at load. ORT_ENABLE_EXTENDED is the
+    highest level ORT documents as portable: ORT_ENABLE_ALL adds layout
+    transforms that are specific to the exporting machine's CPU.
+    """
+    try:
+        import onnxruntime as ort
+    except Exception as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "--pre-optimize requested but onnxruntime is unavailable; "
+            "install onnxruntime in the selected python environment"
+        ) from exc
+
+    tmp = path.with_suffix(".ortopt.tmp.onnx")
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = _ORT_INTRA_OP_THREADS
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = tmp.as_posix()
+    if needs_external_data(path):
+        options.add_session_config_entry(
+            "session.optimized_model_external_initializers_file_name", tmp.name + ".data"
+        )
+    ort.InferenceSession(path.as_posix(), options, providers=["CPUExecutionProvider"])
+    publish_graph(tmp, path)
+    print(f"pre-optimized (ORT) -> {path}")
+
+
+def externalize_weights(path: Path) -> str:
+    """Move a graph's large initializers into a page-aligned <name>.onnx.data.
+
+    Inline protobuf tensors are unaligned, so ORT must copy each one into an
+    aligned buffer at session creation. The side file keeps every tensor at
+    an EXTERNAL_DATA_ALIGNMENT offset, which ORT maps instead of copying.
+    Returns the side file's name, resolved next to the graph at load time.
+    """
+    from onnx.external_data_helper import set_external_data
+
+    model = onnx.load(path.as_posix())
+    tmp_graph = path.with_name(path.name + ".tmp")
+    tmp_data = tmp_graph.with_name(tmp_graph.name + ".data")
+    with tmp_data.open("wb") as data_file:
+        for init in model.graph.initializer:
+            if not init.HasField("raw_data"):
+                if init.data_type == TensorProto.STRING:
+                    continue
+                init.CopyFrom(numpy_helper.from_array(numpy_helper.to_array(init), init.name))
+            if len(init.raw_data) < EXTERNAL_DATA_MIN_TENSOR_BYTES:
+                continue
+            end = data_file.tell()
+            offset = end + (-end % EXTERNAL_DATA_ALIGNMENT)
+            data_file.seek(offset)
+            data_file.write(init.raw_data)
+            set_external_data(init, tmp_data.name, offset=offset, length=len(init.raw_data))
+            init.ClearField("raw_data")
+            init.data_location = TensorProto.EXTERNAL
+    tmp_graph.write_bytes(model.SerializeToString())
+    data_name = publish_graph(tmp_graph, path)
+    print(f"externalized weights -> {data_name}")
+    return data_name
+
+
+def optimize_onnx(path: Path, kind: OptimizerKind) -> None:
+    """Constant-fold and fuse a graph in place after export.
+
+    torch's exporter folds only what it can see during tracing; values
+    derived from init_states buffers survive as live subgraphs until an
+    ONNX-level pass removes them.
+    """
+    if kind == "none":
+        return
+
+    tmp = path.with_suffix(".opt.tmp.onnx")
+    if kind == "transformer":
+        try:
+            from onnxruntime.transformers.optimizer import optimize_model
+        except Exception as exc:  # pragma: no cover - runtime dependency
+            raise RuntimeError(
+                "--optimize requested but onnxruntime.transformers is unavailable; "
+                "install onnxruntime in the selected python environment"
+            ) from exc
+        # num_heads/hidden_size of 0 let the fusions detect them from the graph.
+        # opt_level=2 is ORT_ENABLE_EXTENDED, the same portable ceiling as
+        # pre_optimize_onnx: level 99 (ALL) would bake the exporting CPU's
+        # layout transforms into the shipped graph.
+        optimized = optimize_model(
+            path.as_posix(), model_type="bert", num_heads=0, hidden_size=0, opt_level=2, use_gpu=False
+        )
+        optimized.save_model_to_file(tmp.as_posix(), use_external_data_format=needs_external_data(path))
+        publish_graph(tmp, path)
+    else:
+        try:
+            import onnxoptimizer
+        except Exception as exc:  # pragma: no cover - runtime dependency
+            raise RuntimeError(
+                "--optimize requested but onnxoptimizer is unavailable; "
+                "install onnxoptimizer in the selected python environment"
+            ) from exc
+        model = onnx.load(path.as_posix())
+        onnx.save(onnxoptimizer.optimize(model, list(CONV_OPTIMIZER_PASSES)), tmp.as_posix())
+        publish_graph(tmp, path)
+    print(f"optimized ({kind}) -> {path}")
+
+
+def finalize_graph(spec: ExportSpec, out_path: Path, args: argparse.Namespace) -> dict[str, Any]:
+    """Run post-export steps on an exported graph and return its manifest entry."""
+    simplify_stats = simplify_onnx(out_path) if args.simplify else {}
+    optimizer = spec.optimizer if args.optimize else "none"
+    optimize_onnx(out_path, optimizer)
+
+    # Convert before quantization, which rewrites out_path in place.
+    variants: list[dict[str, Any]] = []
+    if args.fp16:
+        fp16_path = convert_fp16(out_path)
+        variants.append(
+            {
+                "dtype": "float16",
+                "filename": fp16_path.name,
+                "size_bytes": int(fp16_path.stat().st_size),
+            }
+        )
+    if args.bf16:
+        bf16_path = convert_bf16(out_path)
+        variants.append(
+            {
+                "dtype": "bfloat16_weights",
+                "filename": bf16_path.name,
+                "size_bytes": int(bf16_path.stat().st_size),
+            }
+        )
+
+    quant_mode = spec.quant_mode if args.int8 else "none"
+    quant_ops = resolve_quant_ops(spec, args.int8_conv)
+    if quant_mode == "dynamic_int8" and args.int8_mode == "static":
+        quant_mode = "static_int8"
+        quantize_static_from_examples(
+            out_path,
+            spec.example_inputs,
+            spec.input_names,
+            op_types=quant_ops,
+            per_channel=args.int8_per_channel,
+        )
+    else:
+        quantize_int8(out_path, mode=quant_mode, op_types=quant_ops)
+    if args.pre_optimize:
+        pre_optimize_onnx(out_path)
+    # Quantizers and optimizers spill to a side file on their own once a
+    # graph nears the protobuf limit, so check even without --external-data.
+    external_data = externalize_weights(out_path) if args.external_data else external_data_name(out_path)
+    tuned_threads = (
+        tune_intra_op_threads(out_path, spec.example_inputs, spec.input_names)
+        if args.tune_threads
+        else None
+    )
+    entry = {
+        "name": spec.name,
+        "size_bytes": int(out_path.stat().st_size),
+        **spec.manifest_extra,
+        "exporter": "dynamo" if use_dynamo_exporter(spec, args.dynamo) else "torchscript",
+        "dtype": "float32",
+        "quant_mode": quant_mode,
+        "optimizer": optimizer,
+        "ort_pre_optimized": bool(args.pre_optimize),
+        **simplify_stats,
+        **inspect_onnx(out_path),
+    }
+    if quant_mode in ("dynamic_int8", "static_int8"):
+        entry["quant_ops"] = list(quant_ops)
+    if tuned_threads is not None:
+        entry["tuned_intra_op_threads"] = tuned_threads
+    if external_data is not None:
+        entry["external_data"] = external_data
+    if variants:
+        entry["variants"] = variants
+    return entry
+
+
+def export_graph(spec: ExportSpec, out_dir: Path, args: argparse.Namespace) -> dict[str, Any]:
+    """Export, optionally quantize, and inspect one spec; returns its manifest entry."""
+    return finalize_graph(spec, export_one(spec, out_dir, dynamo=args.dynamo), args)
+
+
+def export_pipelined(specs: Iterable[ExportSpec], out_dir: Path, args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Export specs on the calling thread while a background thread finalizes them.
+
+    Tracing graph N+1 overlaps with quantizing/inspecting graph N. A single
+    consumer drains the FIFO queue, so manifest entries keep spec order.
+    Queued specs are detached from their wrappers and the queue holds one
+    graph, so tracing never runs more than one graph ahead and released
+    model parts are actually freed.
+    """
+    pending: queue.Queue[tuple[ExportSpec, Path] | None] = queue.Queue(maxsize=1)
+    entries: list[dict[str, Any]] = []
+    errors: list[BaseException] = []
+
+    def consume() -> None:
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            if errors:
+                continue
+            try:
+                entries.append(finalize_graph(item[0], item[1], args))
+            except BaseException as exc:  # re-raised on the main thread
+                errors.append(exc)
+
+    worker = threading.Thread(target=consume, name="finalize-onnx", daemon=True)
+    worker.start()
+    try:
+        for spec in specs:
+            if errors:
+                break
+            out_path = export_one(spec, out_dir, dynamo=args.dynamo)
+            detached = spec.detached()
+            del spec
+            pending.put((detached, out_path))
+            del detached
+    finally:
+        pending.put(None)
+        worker.join()
+
+    if errors:
+        raise errors[0]
+    return entries
+
+
+def pocket_tts_version() -> str:
+    """Installed pocket-tts version, used to key caches derived from the model."""
+    try:
+        from importlib.metadata import version
+
+        return version("pocket-tts")
+    except Exception:  # pragma: no cover - metadata missing for source checkouts
+        return "unknown"
+
+
+def model_cache_path(load_kwargs: dict[str, str], models_dir: Path) -> Path:
+    """Cache file for a model keyed by its load kwargs and the pocket-tts version."""
+    key = json.dumps(
+        {"load": load_kwargs, "models_dir": models_dir.resolve().as_posix(), "pocket_tts": pocket_tts_version()},
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return models_dir / MODEL_CACHE_DIR / f"tts_state_{digest}.pt"
+
+
+def build_model_skeleton(load_kwargs: dict[str, str]) -> TTSModel:
+    """Build the TTSModel described by `load_kwargs` without fetching any weights.
+
+    Mirrors TTSModel.load_model's config resolution and defaults, but strips
+    the weight paths so only the tokenizer is resolved; load_model fills the
+    weights in from its cached state_dict. Upstream logs an "uninitialized"
+    warning for the stripped config.
+    """
+    from pocket_tts.models import tts_model as tts_model_module
+    from pocket_tts.utils.config import load_config
+
+    config_path = str(
+        load_kwargs.get("config") or tts_model_module.CONFIGS_DIR / f"{load_kwargs['language']}.yaml"
+    )
+    config = load_config(config_path)
+    config = config.model_copy(
+        update={
+            "weights_path": None,
+            "flow_lm": config.flow_lm.model_copy(update={"weights_path": None}),
+            "mimi": config.mimi.model_copy(update={"weights_path": None}),
+        }
+    )
+    return TTSModel._from_pydantic_config_with_weights(
+        config,
+        config.default_temperature,
+        tts_model_module.DEFAULT_SAMPLER_DECODE_STEPS,
+        tts_model_module.DEFAULT_NOISE_CLAMP,
+        tts_model_module.DEFAULT_EOS_THRESHOLD,
+        origin=Path(config_path),
+    )
+
+
+def load_model(load_kwargs: dict[str, str], cache_path: Path | None = None) -> TTSModel:
+    """Load the TTSModel, going through a cached state_dict at `cache_path` if given.
+
+    Only tensors (and the voice-cloning flag) are cached and they are read
+    back with weights_only=True, so a tampered cache file cannot run code.
+    The module tree is rebuilt from config and the memory-mapped weights are
+    assigned in place, so they are only paged in as they are touched and the
+    weight files are never resolved on a hit.
+    """
+    if cache_path is not None and cache_path.exists():
+        print(f"loading cached pocket-tts model from {cache_path}")
+        try:
+            model = build_model_skeleton(load_kwargs)
+        except (AttributeError, ImportError, TypeError) as exc:
+            # build_model_skeleton leans on pocket-tts internals; if they
+            # moved, load through the public API instead of failing.
+            print(f"cannot rebuild the cached model ({exc}); loading it through pocket-tts")
+            return TTSModel.load_model(**load_kwargs)
+        cached = torch.load(cache_path.as_posix(), map_location="cpu", mmap=True, weights_only=True)
+        model.load_state_dict(cached["state_dict"], strict=True, assign=True)
+        model.has_voice_cloning = bool(cached["has_voice_cloning"])
+        return model
+
+    model = TTSModel.load_model(**load_kwargs)
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        torch.save(
+            {"state_dict": model.state_dict(), "has_voice_cloning": model.has_voice_cloning},
+            tmp_path.as_posix(),
+        )
+        os.replace(tmp_path, cache_path)
+    return model
+
+
+# Intra-op threads for the ORT sessions the exporter opens itself while
+# finalizing graphs (0: ORT's default of one per core).
+_ORT_INTRA_OP_THREADS = 0
+
+
+def configure_torch_threads(num_threads: int = 1, ort_threads: int = 0) -> None:
+    """Size torch's intra-op pool and the exporter's own ORT sessions.
+
+    torch's inter-op pool is pinned to one thread.
+    """
+    global _ORT_INTRA_OP_THREADS
+    _ORT_INTRA_OP_THREADS = ort_threads
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only settable before any inter-op work has started in this process.
+        pass
+
+
+# Per-process model used by parallel export workers (see export_parallel).
+_WORKER_MODEL: TTSModel | None = None
+
+
+def _init_export_worker(load_kwargs: dict[str, str], cache_path: Path | None, num_threads: int) -> None:
+    global _WORKER_MODEL
+    # Also visible to anything the worker itself spawns (e.g. ORT sessions).
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    os.environ["OMP_WAIT_POLICY"] = "PASSIVE"
+    configure_torch_threads(num_threads, ort_threads=num_threads)
+    _WORKER_MODEL = load_model(load_kwargs, cache_path)
+
+
+def _export_worker(name: str, out_dir: Path, args: argparse.Namespace) -> dict[str, Any]:
+    if _WORKER_MODEL is None:
+        raise RuntimeError("export worker used before initialization")
+    for spec in iter_specs_from_args(_WORKER_MODEL, args, only=name):
+        return export_graph(spec, out_dir, args)
+    raise RuntimeError(f"unknown export spec: {name}")
+
+
+def export_parallel(
+    names: list[str],
+    load_kwargs: dict[str, str],
+    out_dir: Path,
+    args: argparse.Namespace,
+    cache_path: Path | None = None,
+) -> list[dict[str, Any]]:
+    """Export specs concurrently, one spec per job, preserving manifest order.
+
+    Live wrappers do not pickle, so each worker loads its own TTSModel once
+    (via the pool initializer) and rebuilds only the spec it is asked for.
+    Workers are spawned rather than forked to avoid inheriting torch/OMP
+    thread pools from the parent.
+    """
+    max_workers = min(len(names), args.jobs)
+    num_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    ctx = multiprocessing.get_context("spawn")
+    # Spawned children load the OMP runtime (via torch) while unpickling the
+    # initializer, before it runs, so the split must also be in the
+    # environment they inherit. It is restored once the pool is gone.
+    worker_env = {"OMP_NUM_THREADS": str(num_threads), "OMP_WAIT_POLICY": "PASSIVE"}
+    previous_env = {key: os.environ.get(key) for key in worker_env}
+    os.environ.update(worker_env)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=ctx,
+            initializer=_init_export_worker,
+            initargs=(load_kwargs, cache_path, num_threads),
+        ) as pool:
+            futures = [pool.submit(_export_worker, name, out_dir, args) for name in names]
+            return [future.result() for future in futures]
+    finally:
+        for key, value in previous_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def tensor_shape_to_json(tensor_type: onnx.TypeProto.Tensor) -> list[Any]:
+    # Symbolic name, else static size; unset (or zero) dims stay unknown.
+    return [d.dim_param or int(d.dim_value) or "?" for d in tensor_type.shape.dim]
+
+
+def read_graph_io(path: Path) -> dict[str, list[onnx.ValueInfoProto]]:
+    """Return a graph's input/output ValueInfo without loading external weights."""
+    graph = onnx.load(path.as_posix(), load_external_data=False).graph
+    return {"input": list(graph.input), "output": list(graph.output)}
+
+
+def inspect_onnx(path: Path) -> dict[str, Any]:
+    # Only graph input/output ValueInfo is needed; never pull external
+    # weight blobs into memory just to build the manifest.
+    graph_io = read_graph_io(path)
 
     def to_entries(values: list[onnx.ValueInfoProto]) -> list[dict[str, Any]]:
         entries: list[dict[str, Any]] = []
@@ -362,117 +1425,409 @@ def inspect_onnx(path: Path) -> dict[str, Any]:
 
     return {
         "filename": path.name,
-        "inputs": to_entries(list(graph.input)),
-        "outputs": to_entries(list(graph.output)),
+        "inputs": to_entries(graph_io["input"]),
+        "outputs": to_entries(graph_io["output"]),
+    }
+
+
+def capture_calibration_tensors(model: TTSModel, text: str, voice: str) -> dict[str, torch.Tensor]:
+    """Run one FP32 synthesis and capture real inputs at each graph boundary.
+
+    Forward hooks record the conditioner tokens/embeddings, the latent frames
+    fed back into the LM, the first flow_net call, the quantizer output that
+    feeds the Mimi decoder, and the generated audio. The tensors replace
+    random example inputs, which improves both tracing coverage and the
+    activation ranges seen by static INT8 calibration.
+    """
+    captured: dict[str, list[torch.Tensor]] = {}
+
+    def keep(key: str, value: torch.Tensor) -> None:
+        captured.setdefault(key, []).append(value.detach().clone())
+
+    # Voice-prompt and text-prefill passes run the conditioner and the LM on a
+    # zero-length time axis; they carry no real inputs, so skip them.
+    def on_conditioner(_module: torch.nn.Module, inputs: tuple, output: torch.Tensor) -> None:
+        if inputs[0].tokens.shape[-1] > 0:
+            keep("tokens", inputs[0].tokens)
+            keep("text_embeddings", output)
+
+    def on_input_linear(_module: torch.nn.Module, inputs: tuple) -> None:
+        if inputs[0].shape[1] > 0:
+            keep("sequence", inputs[0])
+
+    def on_flow_net(_module: torch.nn.Module, inputs: tuple) -> None:
+        if len(inputs) == 4 and "flow_x" not in captured:
+            for key, value in zip(("flow_condition", "flow_s", "flow_t", "flow_x"), inputs):
+                keep(key, value)
+
+    def on_quantizer(_module: torch.nn.Module, _inputs: tuple, output: torch.Tensor) -> None:
+        keep("mimi_latent", output)
+
+    flow_lm = model.flow_lm
+    hooks = [
+        flow_lm.conditioner.register_forward_hook(on_conditioner),
+        flow_lm.input_linear.register_forward_pre_hook(on_input_linear),
+        flow_lm.flow_net.register_forward_pre_hook(on_flow_net),
+        model.mimi.quantizer.register_forward_hook(on_quantizer),
+    ]
+    try:
+        with torch.no_grad():
+            voice_state = model.get_state_for_audio_prompt(voice)
+            audio = model.generate_audio(voice_state, text)
+    finally:
+        for hook in hooks:
+            hook.remove()
+
+    # input_linear sees one [1, 1, ldim] frame per AR step. BOS arrives with
+    # its NaN sentinel already replaced by bos_emb, so drop those frames by
+    # value rather than by position.
+    bos_emb = flow_lm.bos_emb.detach()
+    frames = [
+        frame[:, -1:, :]
+        for frame in captured.get("sequence", [])
+        if not torch.equal(frame[0, -1], bos_emb)
+    ]
+    if not frames or "text_embeddings" not in captured or "mimi_latent" not in captured:
+        raise RuntimeError("calibration run did not reach the flow LM and Mimi decoder")
+
+    tensors = {
+        "latents": torch.cat(frames, dim=1),
+        "mimi_latent": torch.cat(captured["mimi_latent"], dim=-1),
+        "audio": audio.detach().reshape(1, 1, -1),
+    }
+    for key in ("tokens", "text_embeddings", "flow_condition", "flow_s", "flow_t", "flow_x"):
+        if key in captured:
+            tensors[key] = captured[key][0]
+    return tensors
+
+
+def load_calibration(args: argparse.Namespace, model: TTSModel | None = None) -> dict[str, torch.Tensor] | None:
+    """Load cached calibration tensors, capturing them first if a model is given."""
+    if not args.calibrate:
+        return None
+    cache_path = Path(args.out_dir) / CALIBRATION_DIR / "calibration.pt"
+    # Tensors come from running this model, so a different model or
+    # pocket-tts release exported into the same --out-dir must recapture.
+    key = {
+        "text": args.calibration_text,
+        "voice": args.calibration_voice,
+        "format": CALIBRATION_FORMAT,
+        "load": resolve_model_source(args)[0],
+        "pocket_tts": pocket_tts_version(),
     }
+    if cache_path.exists():
+        cached = torch.load(cache_path.as_posix(), map_location="cpu", weights_only=True)
+        if cached.get("key") == key:
+            return cached["tensors"]
+    if model is None:
+        raise RuntimeError(f"calibration cache missing or stale: {cache_path}")
+
+    print(f"capturing calibration tensors from {args.calibration_text!r}")
+    tensors = capture_calibration_tensors(model, args.calibration_text, args.calibration_voice)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save({"key": key, "tensors": tensors}, cache_path.as_posix())
+    return tensors
+
+
+def fit_last_axis(tensor: torch.Tensor, length: int) -> torch.Tensor:
+    """Tile or crop a tensor's last axis to exactly `length` entries."""
+    reps = -(-length // tensor.shape[-1])
+    return tensor.repeat(*([1] * (tensor.dim() - 1)), reps)[..., :length].contiguous()
+
+
+def static_example(
+    calibration: dict[str, torch.Tensor], key: str, default: torch.Tensor
+) -> torch.Tensor:
+    """Use a calibration tensor only if it matches a static example's shape/dtype."""
+    value = calibration.get(key)
+    if value is None or value.shape != default.shape or value.dtype != default.dtype:
+        return default
+    return value
+
+
+def spec_names(
+    text_buckets: tuple[int, ...] = (),
+    flow_lm_buckets: tuple[int, ...] = (),
+    static_step: bool = False,
+) -> list[str]:
+    """Names yielded by iter_specs, in the same order."""
+    return [
+        "text_conditioner",
+        *(f"text_conditioner_s{length}" for length in text_buckets),
+        "flow_lm_main",
+        *(f"flow_lm_main_l{length}" for length in flow_lm_buckets),
+        *(["flow_lm_main_bos"] if static_step else []),
+        "flow_lm_prefill",
+        "flow_lm_step",
+        "flow_lm_flow",
+        "latent_to_mimi",
+        "mimi_encoder",
+        "mimi_decoder",
+    ]
+
 
+def iter_specs(
+    model: TTSModel,
+    max_sequence_length: int = 256,
+    text_buckets: tuple[int, ...] = (),
+    calibration: dict[str, torch.Tensor] | None = None,
+    only: str | None = None,
+    release: bool = False,
+    flow_lm_buckets: tuple[int, ...] = (),
+    kv_layout: KVLayout = "static",
+    stack_kv: bool = False,
+    bos_mask: bool = False,
+    static_step: bool = False,
+) -> Iterator[ExportSpec]:
+    """Yield export specs one at a time, building each wrapper lazily.
+
+    Only the spec being exported (and whatever the caller still references)
+    is alive at once. `only` restricts iteration to a single named spec.
+    With `release`, submodules are dropped from `model` as soon as no later
+    spec needs them; the model must not be reused afterwards.
+    """
+
+    def want(name: str) -> bool:
+        return only is None or name == only
+
+    # Real tensors from a calibration synthesis replace random examples
+    # where available (see capture_calibration_tensors).
+    calib = calibration or {}
+    latents = calib.get("latents", torch.randn(1, 13, 32, dtype=torch.float32))
+    text_embeddings = calib.get("text_embeddings", torch.randn(1, 8, 1024, dtype=torch.float32))
+    mimi_latent = calib.get("mimi_latent")
+    audio = calib.get("audio")
 
-def build_specs(model: TTSModel, max_sequence_length: int = 256) -> list[ExportSpec]:
     # Determine KV-cache layer count and dimensions for prefill/step specs.
-    _num_kv_layers = sum(
-        1 for _, m in model.flow_lm.named_modules() if hasattr(m, "_cache_backend")
-    )
+    # Walked once here and shared with the prefill/step wrappers.
+    _kv_modules = kv_cache_modules(model.flow_lm)
+    _num_kv_layers = len(_kv_modules)
     _num_heads = model.flow_lm.transformer.layers[0].self_attn.num_heads
     _head_dim = model.flow_lm.transformer.layers[0].self_attn.dim_per_head
     _T_ex = 8  # example text token count for tracing
-    _example_kv = [
-        torch.zeros(2, 1, _T_ex, _num_heads, _head_dim) for _ in range(_num_kv_layers)
-    ]
+    _kv_len = max_sequence_length if kv_layout == "static" else _T_ex
     _example_offset = torch.tensor([_T_ex], dtype=torch.long)
-    _kv_names = [f"kv_{i}" for i in range(_num_kv_layers)]
-    _kv_out_names = [f"kv_out_{i}" for i in range(_num_kv_layers)]
-
-    return [
-        ExportSpec(
+    if stack_kv:
+        _example_kv = [torch.zeros(_num_kv_layers, 2, 1, _kv_len, _num_heads, _head_dim)]
+        _kv_names, _kv_out_names, _kv_axis = ["kv"], ["kv_out"], 3
+    else:
+        _example_kv = [
+            torch.zeros(2, 1, _kv_len, _num_heads, _head_dim) for _ in range(_num_kv_layers)
+        ]
+        _kv_names = [f"kv_{i}" for i in range(_num_kv_layers)]
+        _kv_out_names = [f"kv_out_{i}" for i in range(_num_kv_layers)]
+        _kv_axis = 2
+
+    if want("text_conditioner"):
+        yield ExportSpec(
             name="text_conditioner",
             filename="text_conditioner.onnx",
             input_names=["tokens"],
             output_names=["text_embeddings"],
             dynamic_axes={"tokens": {1: "text_tokens"}, "text_embeddings": {1: "text_tokens"}},
-            example_inputs=(torch.tensor([[1, 2, 3, 4, 5, 6, 7, 8]], dtype=torch.long),),
+            example_inputs=(
+                calib.get("tokens", torch.tensor([[1, 2, 3, 4, 5, 6, 7, 8]], dtype=torch.long)),
+            ),
+            module=TextConditionerWrapper(model),
+            quant_mode="none",
+        )
+
+    # Fixed-length text_conditioner variants. With no symbolic token axis the
+    # positional slice and embedding gather constant-fold completely; the
+    # runtime pads tokens up to the smallest bucket that fits and keeps the
+    # dynamic graph above as the fallback for longer inputs.
+    for length in text_buckets:
+        if not want(f"text_conditioner_s{length}"):
+            continue
+        yield ExportSpec(
+            name=f"text_conditioner_s{length}",
+            filename=f"text_conditioner_s{length}.onnx",
+            input_names=["tokens"],
+            output_names=["text_embeddings"],
+            dynamic_axes={},
+            example_inputs=((torch.arange(length, dtype=torch.long) % 8 + 1).unsqueeze(0),),
             module=TextConditionerWrapper(model),
-        ),
-        ExportSpec(
-            name="flow_lm_main",
-            filename="flow_lm_main.onnx",
-            input_names=["sequence", "text_embeddings"],
+            quant_mode="none",
+            manifest_extra={"shape_bucket": length},
+        )
+
+    # flow_lm_main re-runs the whole sequence with a KV state sized at trace
+    # time. Extra copies with smaller/larger state let the runtime pick the
+    # smallest graph whose max_seq_len fits text + latent steps.
+    flow_lm_mains = [("flow_lm_main", max_sequence_length)] + [
+        (f"flow_lm_main_l{length}", length) for length in flow_lm_buckets
+    ]
+    # BOS is signalled either by a NaN sentinel frame, whose example ensures
+    # torch.isnan() is traced into the graph, or by an explicit bos_mask input.
+    _bos_frame = (
+        torch.zeros(1, 1, 32, dtype=torch.float32)
+        if bos_mask
+        else torch.full((1, 1, 32), float("nan"), dtype=torch.float32)
+    )
+    _bos_names = ["bos_mask"] if bos_mask else []
+    # First position is BOS; rest are normal latents.
+    _main_sequence = torch.cat([_bos_frame, latents[:, :7, :]], dim=1)
+    _main_mask: tuple[torch.Tensor, ...] = ()
+    if bos_mask:
+        # Sized from the sequence so calibration latents of any length fit.
+        _mask = torch.zeros(_main_sequence.shape[:2], dtype=torch.float32)
+        _mask[:, 0] = 1.0
+        _main_mask = (_mask,)
+    _step_mask = (torch.ones(1, 1),) if bos_mask else ()
+    for name, length in flow_lm_mains:
+        if not want(name):
+            continue
+        yield ExportSpec(
+            name=name,
+            filename=f"{name}.onnx",
+            input_names=["sequence", "text_embeddings"] + _bos_names,
             output_names=["last_hidden", "eos_logits"],
             dynamic_axes={
                 "sequence": {1: "sequence_steps"},
                 "text_embeddings": {1: "text_tokens"},
+                **{mask_name: {1: "sequence_steps"} for mask_name in _bos_names},
             },
-            example_inputs=(
-                # First position is NaN (BOS sentinel); rest are normal latents.
-                # This ensures torch.isnan() is always traced into the ONNX graph.
-                torch.cat([
-                    torch.full((1, 1, 32), float("nan"), dtype=torch.float32),
-                    torch.randn(1, 7, 32, dtype=torch.float32),
-                ], dim=1),
-                torch.randn(1, 8, 1024, dtype=torch.float32),
-            ),
+            example_inputs=(_main_sequence, text_embeddings, *_main_mask),
+            module=FlowLMMainWrapper(model, max_sequence_length=length),
+            optimizer="transformer",
+            quant_mode="matmul_nbits",
+            manifest_extra={"max_seq_len": length},
+        )
+
+    # First AR call of the non-stateful path: the sequence is only the BOS
+    # frame, so a graph with a static [1, 1, 32] sequence can fold every
+    # sequence-length-dependent shape computation.
+    if static_step and want("flow_lm_main_bos"):
+        yield ExportSpec(
+            name="flow_lm_main_bos",
+            filename="flow_lm_main_bos.onnx",
+            input_names=["sequence", "text_embeddings"] + _bos_names,
+            output_names=["last_hidden", "eos_logits"],
+            dynamic_axes={"text_embeddings": {1: "text_tokens"}},
+            example_inputs=(_bos_frame, text_embeddings, *_step_mask),
             module=FlowLMMainWrapper(model, max_sequence_length=max_sequence_length),
-        ),
-        ExportSpec(
+            optimizer="transformer",
+            quant_mode="matmul_nbits",
+            manifest_extra={"max_seq_len": max_sequence_length, "sequence_steps": 1},
+        )
+
+    if want("flow_lm_prefill"):
+        yield ExportSpec(
             name="flow_lm_prefill",
             filename="flow_lm_prefill.onnx",
             input_names=["text_embeddings"],
             output_names=_kv_names + ["offset"],
             dynamic_axes={
                 "text_embeddings": {1: "text_tokens"},
-                **{f"kv_{i}": {2: "text_tokens"} for i in range(_num_kv_layers)},
+                **(
+                    {name: {_kv_axis: "text_tokens"} for name in _kv_names}
+                    if kv_layout == "trimmed"
+                    else {}
+                ),
             },
-            example_inputs=(torch.randn(1, _T_ex, 1024),),
-            module=FlowLMPrefillWrapper(model, max_sequence_length=max_sequence_length),
-        ),
-        ExportSpec(
+            example_inputs=(text_embeddings,),
+            module=FlowLMPrefillWrapper(
+                model,
+                max_sequence_length=max_sequence_length,
+                kv_layout=kv_layout,
+                stack_kv=stack_kv,
+                kv_modules=_kv_modules,
+            ),
+            optimizer="transformer",
+            quant_mode="matmul_nbits",
+            manifest_extra={"max_seq_len": max_sequence_length, "kv_layout": kv_layout, "kv_stacked": stack_kv},
+        )
+
+    if want("flow_lm_step"):
+        yield ExportSpec(
             name="flow_lm_step",
             filename="flow_lm_step.onnx",
-            input_names=["sequence_frame"] + _kv_names + ["offset"],
+            input_names=["sequence_frame"] + _kv_names + ["offset"] + _bos_names,
             output_names=["last_hidden", "eos_logits"] + _kv_out_names + ["offset_out"],
+            # The static layout has no dynamic axes: every KV tensor is max_seq long.
             dynamic_axes={
-                **{f"kv_{i}": {2: "seq_len"} for i in range(_num_kv_layers)},
-                **{f"kv_out_{i}": {2: "seq_len_plus_one"} for i in range(_num_kv_layers)},
-            },
+                **{name: {_kv_axis: "seq_len"} for name in _kv_names},
+                **{name: {_kv_axis: "seq_len_plus_one"} for name in _kv_out_names},
+            }
+            if kv_layout == "trimmed"
+            else {},
             example_inputs=(
-                torch.full((1, 1, 32), float("nan")),
+                _bos_frame,
                 *_example_kv,
                 _example_offset,
+                *_step_mask,
             ),
-            module=FlowLMStepWrapper(model, max_sequence_length=max_sequence_length),
-        ),
-        ExportSpec(
+            module=FlowLMStepWrapper(
+                model,
+                max_sequence_length=max_sequence_length,
+                kv_layout=kv_layout,
+                stack_kv=stack_kv,
+                bos_mask=bos_mask,
+                kv_modules=_kv_modules,
+            ),
+            optimizer="transformer",
+            quant_mode="matmul_nbits",
+            manifest_extra={"max_seq_len": max_sequence_length, "kv_layout": kv_layout, "kv_stacked": stack_kv},
+        )
+
+    if want("flow_lm_flow"):
+        yield ExportSpec(
             name="flow_lm_flow",
             filename="flow_lm_flow.onnx",
             input_names=["condition", "s", "t", "x"],
             output_names=["flow_direction"],
             dynamic_axes={},
             example_inputs=(
-                torch.randn(1, 1024, dtype=torch.float32),
-                torch.zeros(1, 1, dtype=torch.float32),
-                torch.ones(1, 1, dtype=torch.float32),
-                torch.randn(1, 32, dtype=torch.float32),
+                static_example(calib, "flow_condition", torch.randn(1, 1024, dtype=torch.float32)),
+                static_example(calib, "flow_s", torch.zeros(1, 1, dtype=torch.float32)),
+                static_example(calib, "flow_t", torch.ones(1, 1, dtype=torch.float32)),
+                static_example(calib, "flow_x", torch.randn(1, 32, dtype=torch.float32)),
             ),
             module=FlowLMFlowWrapper(model),
-        ),
-        ExportSpec(
+            quant_mode="none",
+            dynamo=True,
+        )
+
+    if want("latent_to_mimi"):
+        yield ExportSpec(
             name="latent_to_mimi",
             filename="latent_to_mimi.onnx",
             input_names=["latent"],
             output_names=["mimi_latent"],
             dynamic_axes={"latent": {1: "latent_steps"}, "mimi_latent": {2: "latent_steps"}},
-            example_inputs=(torch.randn(1, 13, 32, dtype=torch.float32),),
+            example_inputs=(latents,),
             module=LatentToMimiWrapper(model),
-        ),
-        ExportSpec(
+            optimizer="conv",
+            # A single 32->512 pointwise Conv: nothing for MatMul/Gemm
+            # quantization to touch, and too small to gain from ConvInteger.
+            quant_mode="none",
+        )
+
+    # Every remaining spec only needs Mimi; let the flow LM be collected
+    # before the (large) Mimi graphs are traced.
+    if release:
+        del _kv_modules
+        model.flow_lm = None
+
+    if want("mimi_encoder"):
+        yield ExportSpec(
             name="mimi_encoder",
             filename="mimi_encoder.onnx",
             input_names=["audio"],
             output_names=["latent"],
             dynamic_axes={"audio": {2: "audio_samples"}, "latent": {2: "latent_steps"}},
-            example_inputs=(torch.randn(1, 1, 24000, dtype=torch.float32),),
+            example_inputs=(
+                fit_last_axis(audio, 24000)
+                if audio is not None
+                else torch.randn(1, 1, 24000, dtype=torch.float32),
+            ),
             module=MimiEncoderWrapper(model),
-        ),
-        ExportSpec(
+            optimizer="conv",
+            quant_conv=True,
+        )
+
+    if want("mimi_decoder"):
+        yield ExportSpec(
             name="mimi_decoder",
             filename="mimi_decoder.onnx",
             input_names=["latent"],
@@ -482,10 +1837,49 @@ def build_specs(model: TTSModel, max_sequence_length: int = 256) -> list[ExportS
             # traced as constants by the legacy ONNX exporter. Trace at the
             # configured maximum latent length, while the wrapper sizes Mimi's
             # internal state to max_latents * mimi_steps_per_latent.
-            example_inputs=(torch.randn(1, 512, max_sequence_length, dtype=torch.float32),),
+            example_inputs=(
+                fit_last_axis(mimi_latent, max_sequence_length)
+                if mimi_latent is not None
+                else torch.randn(1, 512, max_sequence_length, dtype=torch.float32),
+            ),
             module=MimiDecoderWrapper(model, max_latent_steps=max_sequence_length),
-        ),
-    ]
+            optimizer="conv",
+            quant_conv=True,
+            manifest_extra={"max_seq_len": max_sequence_length},
+        )
+
+
+def iter_specs_from_args(
+    model: TTSModel,
+    args: argparse.Namespace,
+    calibration: dict[str, torch.Tensor] | None = None,
+    only: str | None = None,
+    release: bool = False,
+) -> Iterator[ExportSpec]:
+    return iter_specs(
+        model,
+        max_sequence_length=args.max_seq,
+        text_buckets=args.text_buckets,
+        flow_lm_buckets=args.flow_lm_buckets,
+        kv_layout=args.kv_layout,
+        stack_kv=args.stack_kv,
+        bos_mask=args.bos_mask,
+        static_step=args.static_step,
+        calibration=calibration if calibration is not None else load_calibration(args),
+        only=only,
+        release=release,
+    )
+
+
+def parse_buckets(raw: str) -> tuple[int, ...]:
+    """Parse a comma-separated list of positive bucket sizes."""
+    try:
+        values = sorted({int(part) for part in raw.split(",") if part.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid bucket list: {raw!r}") from None
+    if any(v < 1 for v in values):
+        raise argparse.ArgumentTypeError(f"bucket sizes must be positive: {raw!r}")
+    return tuple(values)
 
 
 def resolve_model_source(args: argparse.Namespace) -> tuple[dict[str, str], dict[str, str]]:
@@ -534,9 +1928,131 @@ def main() -> int:
         default=LEGACY_DEFAULT_VARIANT,
         help="Deprecated compatibility alias; b6369a24 maps to english_2026-01",
     )
-    parser.add_argument("--int8", action="store_true", help="Apply dynamic INT8 quantization to exported ONNX files")
+    parser.add_argument("--int8", action="store_true", help="Quantize exported ONNX files using each graph's policy (dynamic INT8; 4-bit MatMulNBits for the flow LM backbone)")
+    parser.add_argument(
+        "--dynamo",
+        action="store_true",
+        help="Export with the torch.export-based (dynamo) ONNX exporter instead of TorchScript tracing",
+    )
+    parser.add_argument(
+        "--simplify",
+        action="store_true",
+        help="Run onnxsim on each exported graph to drop dead initializers and redundant nodes",
+    )
+    parser.add_argument(
+        "--fp16",
+        action="store_true",
+        help="Also write an FP16 copy of each graph as <name>.fp16.onnx (FP32 inputs/outputs)",
+    )
+    parser.add_argument(
+        "--bf16",
+        action="store_true",
+        help="Also write a copy of each graph with BF16-stored weights as <name>.bf16.onnx (FP32 compute and inputs/outputs)",
+    )
+    parser.add_argument(
+        "--int8-mode",
+        choices=("dynamic", "static"),
+        default="dynamic",
+        help="INT8 scheme for --int8: dynamic weight-only, or static QDQ calibrated on example inputs (default: dynamic)",
+    )
+    parser.add_argument(
+        "--int8-per-channel",
+        action="store_true",
+        help="Use per-channel weight scales with --int8-mode=static (may fail on 3D weights)",
+    )
+    parser.add_argument(
+        "--int8-conv",
+        choices=("auto", "on", "off"),
+        default="auto",
+        help="Quantize Conv in the Mimi graphs with --int8 (dynamic or static): auto enables it only when this CPU has VNNI (default: auto)",
+    )
     parser.add_argument("--max-seq", type=int, default=256, help="KV-cache max sequence length for flow_lm_main and mimi_decoder (default: 256; use 512+ when using voice conditioning)")
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Use tensors captured from a real FP32 synthesis as example/calibration inputs",
+    )
+    parser.add_argument(
+        "--calibration-text",
+        default="This is calibration text.",
+        help="Text synthesized for --calibrate",
+    )
+    parser.add_argument("--calibration-voice", default="alba", help="Voice prompt used for --calibrate")
+    parser.add_argument(
+        "--text-buckets",
+        type=parse_buckets,
+        default=(),
+        help="Also export fixed-length text_conditioner graphs for these token counts, e.g. 32,64,128,256",
+    )
+    parser.add_argument(
+        "--kv-layout",
+        choices=("static", "trimmed"),
+        default="static",
+        help="KV-cache I/O of flow_lm_prefill/step: full max-seq cache updated in place, or the written prefix grown each step (default: static)",
+    )
+    parser.add_argument(
+        "--stack-kv",
+        action="store_true",
+        help="Exchange the flow_lm_prefill/step KV cache as one stacked [L, 2, 1, S, H, Dh] kv/kv_out tensor instead of kv_0..kv_{L-1}",
+    )
+    parser.add_argument(
+        "--bos-mask",
+        action="store_true",
+        help="Give flow_lm_main/step an explicit float bos_mask input instead of detecting NaN BOS sentinels in the graph",
+    )
+    parser.add_argument(
+        "--static-step",
+        action="store_true",
+        help="Also export flow_lm_main_bos with a static single-frame sequence for the first AR call; requires --kv-layout=static, whose flow_lm_step is already fully static",
+    )
+    parser.add_argument(
+        "--flow-lm-buckets",
+        type=parse_buckets,
+        default=(),
+        help="Also export flow_lm_main_l<N> graphs with an N-step KV state, e.g. 128,512 (--max-seq is always exported as flow_lm_main)",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Run ORT's transformer optimizer on the flow LM graphs and onnxoptimizer fusions on the Mimi graphs after export",
+    )
+    parser.add_argument(
+        "--pre-optimize",
+        action="store_true",
+        help="Save each final graph as optimized by ORT (ORT_ENABLE_EXTENDED) so sessions skip that work at load",
+    )
+    parser.add_argument(
+        "--external-data",
+        action="store_true",
+        help="Store each final graph's weights page-aligned in <name>.onnx.data so ORT can mmap them",
+    )
+    parser.add_argument(
+        "--tune-threads",
+        action="store_true",
+        help="Time each final graph with 1/2/4/all intra-op threads and record the fastest in the manifest as tuned_intra_op_threads (informational; best with --jobs 1)",
+    )
+    parser.add_argument(
+        "--cache-model",
+        action="store_true",
+        help=f"Cache the loaded weights under <models-dir>/{MODEL_CACHE_DIR}/ and memory-map them on later runs",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes exporting graphs concurrently (default: 1, sequential; 0: half the CPU cores)",
+    )
     args = parser.parse_args()
+    if args.jobs < 0:
+        raise SystemExit("--jobs must be >= 0")
+    if args.jobs == 0:
+        # Each worker holds a full model copy and tracing is memory-bound, so
+        # leave half the cores for ORT's intra-op pools.
+        args.jobs = max(1, (os.cpu_count() or 1) // 2)
+    if args.static_step and args.kv_layout != "static":
+        raise SystemExit("--static-step requires --kv-layout=static (a trimmed KV cache grows every step)")
+    # The --max-seq graph is already exported as flow_lm_main.
+    args.flow_lm_buckets = tuple(length for length in args.flow_lm_buckets if length != args.max_seq)
 
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -551,29 +2067,57 @@ def main() -> int:
 
     load_kwargs, manifest_source = resolve_model_source(args)
     source_label = ", ".join(f"{key}={value}" for key, value in load_kwargs.items())
-    print(f"loading pocket-tts model {source_label}")
-    model = TTSModel.load_model(**load_kwargs)
-
-    specs = build_specs(model, max_sequence_length=args.max_seq)
+    cache_path = model_cache_path(load_kwargs, models_dir) if args.cache_model else None
     manifest: dict[str, Any] = {
         "variant": args.variant,
         **manifest_source,
         "int8": bool(args.int8),
+        "int8_mode": args.int8_mode if args.int8 else None,
+        "fp16": bool(args.fp16),
+        "bf16": bool(args.bf16),
         "graphs": [],
     }
 
-    for spec in specs:
-        out_path = export_one(spec, out_dir)
-        if args.int8:
-            quantize_int8(out_path)
-        manifest["graphs"].append(
-            {
-                "name": spec.name,
-                "size_bytes": int(out_path.stat().st_size),
-                **inspect_onnx(out_path),
-            }
-        )
+    if args.jobs > 1:
+        # Workers load their own model. The parent only needs one to capture
+        # calibration tensors or warm the model cache, and releases it before
+        # spawning so peak memory is bounded by the pool size.
+        if args.calibrate or args.cache_model:
+            print(f"loading pocket-tts model {source_label}")
+            model = load_model(load_kwargs, cache_path)
+            load_calibration(args, model)
+            del model
+            gc.collect()
+        names = spec_names(args.text_buckets, args.flow_lm_buckets, args.static_step)
+        manifest["graphs"] = export_parallel(names, load_kwargs, out_dir, args, cache_path=cache_path)
+        return write_manifest(manifest, out_dir)
 
+    print(f"loading pocket-tts model {source_label}")
+    model = load_model(load_kwargs, cache_path)
+    calibration = load_calibration(args, model)
+    # Calibration synthesis above used torch's full pool. Tracing is one
+    # Python thread, so from here on torch gets one core and the ORT
+    # sessions opened while finalizing (possibly on the pipeline's thread,
+    # concurrently with tracing) get the rest.
+    configure_torch_threads(1, ort_threads=max(1, (os.cpu_count() or 1) - 1))
+
+    # Specs are built lazily and the flow LM is released once the last spec
+    # that needs it has been exported, so only one wrapper is alive at a time.
+    specs = iter_specs_from_args(model, args, calibration=calibration, release=True)
+    del model, calibration
+    # Thread tuning times graphs, so keep tracing from competing for cores.
+    postprocess = args.int8 or args.fp16 or args.bf16 or args.simplify or args.optimize
+    if (postprocess or args.pre_optimize or args.external_data) and not args.tune_threads:
+        manifest["graphs"] = export_pipelined(specs, out_dir, args)
+    else:
+        for spec in specs:
+            manifest["graphs"].append(export_graph(spec, out_dir, args))
+            del spec
+            gc.collect()
+    return write_manifest(manifest, out_dir)
+
+
+def write_manifest(manifest: dict[str, Any], out_dir: Path) -> int:
     manifest_path = out_dir / "manifest.json"
     manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
     print(f"wrote ONNX manifest: {manifest_path}")
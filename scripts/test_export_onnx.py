@@ -0,0 +1,50 @@
+"""Tests for export_onnx.py helpers that do not need downloaded weights.
+
+Run from the repository root with the export environment's python:
+
+    python -m unittest scripts/test_export_onnx.py
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import onnx  # noqa: F401
+    import pocket_tts  # noqa: F401
+    import torch  # noqa: F401
+except Exception:  # pragma: no cover - runtime dependency
+    export_onnx = None
+else:
+    _spec = importlib.util.spec_from_file_location("export_onnx", Path(__file__).with_name("export_onnx.py"))
+    export_onnx = importlib.util.module_from_spec(_spec)
+    sys.modules["export_onnx"] = export_onnx
+    _spec.loader.exec_module(export_onnx)
+
+
+@unittest.skipIf(export_onnx is None, "export dependencies (torch, onnx, pocket-tts) are not installed")
+class LoadModelCacheTest(unittest.TestCase):
+    def test_falls_back_to_public_loader_when_upstream_internals_moved(self) -> None:
+        load_kwargs = {"language": export_onnx.DEFAULT_LANGUAGE}
+        sentinel = object()
+        # A TTSModel without _from_pydantic_config_with_weights, as after an
+        # upstream rename; only the public load_model is left.
+        renamed = mock.Mock(spec=["load_model"])
+        renamed.load_model.return_value = sentinel
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "tts_state.pt"
+            cache_path.write_bytes(b"")  # a hit; never read on the fallback path
+            with mock.patch.object(export_onnx, "TTSModel", renamed):
+                model = export_onnx.load_model(load_kwargs, cache_path)
+
+        self.assertIs(model, sentinel)
+        renamed.load_model.assert_called_once_with(**load_kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()